@@ -0,0 +1,151 @@
+"""Admin endpoints for profiling a running worker.
+
+Disabled unless ADMIN_TOKEN is set; requests must then send it as a bearer
+token. Each worker profiles itself, so with several workers the response
+names the process that answered.
+"""
+
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import ADMIN_TOKEN
+from app.core.profiling import loop_monitor, profiler, stage_timings
+from app.core.usage import usage_tracker
+from app.models.schemas import LoopMonitorRequest, ProfileRequest, ToggleRequest
+
+
+def require_admin(authorization: str | None = Header(None)):
+    """Reject requests without the admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Bytes, since compare_digest rejects non-ASCII strings
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {ADMIN_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile", status_code=202)
+async def start_profile(request: ProfileRequest):
+    """
+    Start sampling all threads of this worker.
+
+    Runs for `seconds`, or until `jobs` more fact checks have finished.
+    Fetch the result with `GET /admin/profile`.
+    """
+    if request.seconds is None and request.jobs is None:
+        raise HTTPException(status_code=400, detail="Set seconds or jobs")
+    try:
+        profiler.start(seconds=request.seconds, jobs=request.jobs)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"pid": os.getpid(), "running": True}
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile():
+    """
+    Get the samples of the running or last profile as folded stacks.
+
+    The output can be rendered with flamegraph.pl or loaded into speedscope.
+    """
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={
+            "X-Profile-Running": str(profiler.running).lower(),
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Worker-Pid": str(os.getpid()),
+        },
+    )
+
+
+@router.delete("/profile")
+async def stop_profile():
+    """Stop the running profile early."""
+    profiler.stop()
+    return {"pid": os.getpid(), "running": False, "samples": profiler.samples}
+
+
+@router.post("/loop-monitor")
+async def set_loop_monitor(request: LoopMonitorRequest):
+    """Switch logging of event loop stalls on or off."""
+    if request.enabled:
+        loop_monitor.start(request.threshold)
+    else:
+        loop_monitor.stop()
+    return await get_loop_monitor()
+
+
+@router.get("/loop-monitor")
+async def get_loop_monitor():
+    """Get the largest event loop lag and the number of stalls logged."""
+    return {
+        "pid": os.getpid(),
+        "enabled": loop_monitor.enabled,
+        "threshold": loop_monitor.threshold,
+        "maxLag": loop_monitor.max_lag,
+        "stalls": loop_monitor.stalls,
+    }
+
+
+@router.post("/stage-timings")
+async def set_stage_timings(request: ToggleRequest):
+    """Switch recording of per-stage wall-clock and CPU time on or off."""
+    stage_timings.enabled = request.enabled
+    return await get_stage_timings()
+
+
+@router.get("/stage-timings")
+async def get_stage_timings():
+    """Get wall-clock versus CPU time per stage of the fact check pipeline."""
+    return {
+        "pid": os.getpid(),
+        "enabled": stage_timings.enabled,
+        "stages": stage_timings.snapshot(),
+    }
+
+
+@router.delete("/stage-timings")
+async def reset_stage_timings():
+    """Clear the recorded stage timings."""
+    stage_timings.reset()
+    return await get_stage_timings()
+
+
+@router.get("/usage/jobs")
+async def get_job_usage():
+    """Get token usage and cost of the most recent jobs on this worker."""
+    return {
+        "pid": os.getpid(),
+        "jobs": [
+            {
+                "jobId": job.job_id,
+                "clientId": job.client_id,
+                "finished": job.finished,
+                **job.usage.to_dict(),
+            }
+            for job in usage_tracker.recent_jobs()
+        ],
+    }
+
+
+@router.get("/usage/clients")
+async def get_client_usage():
+    """Get token usage and cost of the most recently active clients on this worker."""
+    return {
+        "pid": os.getpid(),
+        "clients": [
+            {"clientId": client_id, **usage.to_dict()}
+            for client_id, usage in usage_tracker.recent_clients()
+        ],
+    }
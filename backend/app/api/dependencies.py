@@ -1,15 +1,65 @@
 """Dependency injection functions."""
 
+from functools import lru_cache
+
+from app.services.checkpoint_store import CheckpointStore
 from app.services.content_service import ContentService
+from app.services.evidence_store import EvidenceStore
 from app.services.openai_service import OpenAIService
+from app.services.result_store import ResultStore
+from app.services.transcript_service import TranscriptService, default_providers
+from app.services.verdict_cache import VerdictCache
+from app.websockets.event_bus import EventBus, create_event_bus
 
 
+@lru_cache
 def get_openai_service() -> OpenAIService:
     """Get or create OpenAI service singleton."""
     return OpenAIService()
 
 
+@lru_cache
+def get_transcript_service() -> TranscriptService:
+    """Get the shared transcript service (keeps breaker and latency state)."""
+    return TranscriptService(default_providers())
+
+
+@lru_cache
+def get_verdict_cache() -> VerdictCache:
+    """Get the shared verdict cache."""
+    return VerdictCache()
+
+
+@lru_cache
+def get_evidence_store() -> EvidenceStore:
+    """Get the shared evidence store."""
+    return EvidenceStore()
+
+
+@lru_cache
+def get_result_store() -> ResultStore:
+    """Get the shared result store."""
+    return ResultStore()
+
+
+@lru_cache
+def get_checkpoint_store() -> CheckpointStore:
+    """Get the shared checkpoint store."""
+    return CheckpointStore()
+
+
+@lru_cache
+def get_event_bus() -> EventBus:
+    """Get the event bus that routes messages between workers."""
+    return create_event_bus()
+
+
 def get_content_service() -> ContentService:
     """Get or create Content service singleton."""
     openai_service = get_openai_service()
-    return ContentService(openai_service)
+    return ContentService(
+        openai_service,
+        get_transcript_service(),
+        get_verdict_cache(),
+        get_evidence_store(),
+    )
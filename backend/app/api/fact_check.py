@@ -1,25 +1,145 @@
 """Fact checking API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import uuid
 
-from app.api.dependencies import get_content_service
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import get_content_service, get_result_store
+from app.core.config import RECONNECT_DELAY
+from app.core.deadline import Deadline, DeadlineExceeded, deadline_scope
+from app.core.lifecycle import is_draining
+from app.core.profiling import profiler
+from app.core.tracing import start_span
+from app.core.usage import usage_tracker
 from app.models.schemas import BodyData
 from app.services.content_service import ContentService
+from app.services.result_store import ResultStore
+from app.services.stream_service import StreamingFactCheck
+from app.services.transcript_service import TranscriptError
 
 router = APIRouter()
 
+# REST requests are not tied to a client, so their usage is pooled
+HTTP_CLIENT_ID = "http"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streaming response for an endpoint that is still reading the request body.
+
+    StreamingResponse watches for disconnects by reading from the client,
+    which would take body chunks that are still being uploaded. Here it only
+    starts watching once ``body_read`` is set; until then the endpoint notices
+    disconnects while reading the body.
+    """
+
+    def __init__(self, content, body_read: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive):
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+
+def _check_not_draining():
+    if is_draining():
+        raise HTTPException(
+            status_code=503,
+            detail="Server is restarting, please retry",
+            headers={"Retry-After": str(RECONNECT_DELAY)},
+        )
+
 
 @router.post("/fact-check")
 async def fact_check(
-    data: BodyData, content_service: ContentService = Depends(get_content_service)
+    data: BodyData,
+    response: Response,
+    content_service: ContentService = Depends(get_content_service),
+    result_store: ResultStore = Depends(get_result_store),
 ):
     """
     Check if content (URL or text) contains fake information.
 
+    The result can be shared via the URL in the Content-Location header.
+
     Returns:
         List of statements with fact-check results
     """
-    try:
-        return content_service.process_content(data.data)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    _check_not_draining()
+
+    deadline = Deadline.from_request(data.timeout)
+    usage = usage_tracker.job(uuid.uuid4().hex, HTTP_CLIENT_ID)
+    with start_span("http.fact_check"), deadline_scope(deadline), usage:
+        try:
+            results = content_service.process_content(data.data)
+            result_id = result_store.save(
+                str(data.data),
+                results,
+                timed_out=any(result.get("timedOut") for result in results),
+            )
+            response.headers["Content-Location"] = f"/results/{result_id}"
+            return results
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except TranscriptError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        finally:
+            profiler.job_finished()
+
+
+@router.post("/fact-check/stream")
+async def fact_check_stream(
+    request: Request,
+    timeout: float | None = None,
+    content_service: ContentService = Depends(get_content_service),
+    result_store: ResultStore = Depends(get_result_store),
+):
+    """
+    Fact check a large document while it is being uploaded.
+
+    Send the document as UTF-8 text in the request body, e.g. with chunked
+    transfer encoding. Statements are extracted from each part of the text as
+    soon as it has arrived, and verified while the upload continues.
+
+    Returns:
+        A stream of JSON lines: a `window` event per extracted part of the
+        text, a `result` event per verified statement (in the order they
+        finish, with the statement's `index` in the document), and a final
+        `complete` event with the `resultId` of the stored results
+    """
+    _check_not_draining()
+
+    deadline = Deadline.from_request(timeout)
+    fact_check = StreamingFactCheck(content_service, deadline)
+    body_read = asyncio.Event()
+
+    async def body():
+        async for chunk in request.stream():
+            yield chunk
+        # From here on a disconnect cancels the verifications still running
+        body_read.set()
+
+    async def events():
+        usage = usage_tracker.job(uuid.uuid4().hex, HTTP_CLIENT_ID)
+        with start_span("http.fact_check_stream"), deadline_scope(deadline), usage:
+            try:
+                async for event in fact_check.events(body()):
+                    if event["type"] == "complete":
+                        event["resultId"] = await asyncio.to_thread(
+                            result_store.save,
+                            f"sha256:{fact_check.digest.hexdigest()}",
+                            fact_check.ordered_results(),
+                            event["timedOut"],
+                        )
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+            finally:
+                profiler.job_finished()
+
+    return DuplexStreamingResponse(
+        events(), body_read, media_type="application/x-ndjson"
+    )
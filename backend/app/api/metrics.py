@@ -0,0 +1,17 @@
+"""Prometheus metrics endpoint."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.usage import usage_tracker
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Token usage and cost per operation and job in Prometheus format."""
+    return PlainTextResponse(
+        usage_tracker.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
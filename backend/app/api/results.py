@@ -0,0 +1,44 @@
+"""Endpoints for shared fact-check results."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from app.api.dependencies import get_result_store
+from app.services.result_store import ResultStore
+
+router = APIRouter()
+
+# Results never change once stored, so caches may keep them indefinitely
+RESULT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags
+
+
+@router.api_route("/results/{result_id}", methods=["GET", "HEAD"])
+async def get_result(
+    result_id: str,
+    request: Request,
+    result_store: ResultStore = Depends(get_result_store),
+):
+    """
+    Get a finished fact check by its result id.
+
+    Results are immutable, so responses carry a strong ETag and long-lived
+    Cache-Control headers. Conditional requests with If-None-Match get a 304.
+    """
+    body = result_store.load(result_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+
+    headers = {"ETag": f'"{result_id}"', "Cache-Control": RESULT_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,11 +1,12 @@
 """Application configuration."""
 
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (an explicit path skips searching for the file)
+load_dotenv(Path(__file__).resolve().parents[2] / ".env")
 
 # OpenAI API key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -18,3 +19,97 @@ DEFAULT_MODEL = "gpt-4o"
 
 # API configuration
 MAX_STATEMENTS = 10
+
+# Per-job time budget in seconds (clients may request a value within limits)
+JOB_DEFAULT_TIMEOUT = 120
+JOB_MIN_TIMEOUT = 10
+JOB_MAX_TIMEOUT = 300
+# Share of the remaining budget a stage may use before later stages get a turn
+TRANSCRIPT_BUDGET_SHARE = 0.5
+EXTRACTION_BUDGET_SHARE = 0.5
+
+# Transcript providers
+TRANSCRIPT_TIMEOUT = 45  # seconds per provider request
+TRANSCRIPT_HEDGE_DELAY = 15  # seconds before hedging until enough latencies are known
+TRANSCRIPT_HEDGE_MIN_SAMPLES = 20
+# Extra requests to a platform's only provider when it is slow or fails
+TRANSCRIPT_SAME_PROVIDER_HEDGES = 1
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+CIRCUIT_BREAKER_RESET_TIMEOUT = 60  # seconds
+
+# Verdict cache
+VERDICT_CACHE_TTL = 24 * 60 * 60  # seconds
+VERDICT_CACHE_VOLATILE_TTL = 60 * 60  # claims about "current" figures
+VERDICT_CACHE_MAX_ENTRIES = 10_000
+VERDICT_CACHE_POPULARITY_HALF_LIFE = 60 * 60  # seconds
+
+# Refresh-ahead of popular cached verdicts
+REFRESH_INTERVAL = 60  # seconds between refresh runs
+REFRESH_AHEAD_WINDOW = 10 * 60  # refresh entries expiring within this window
+REFRESH_OFF_PEAK_WINDOW = 6 * 60 * 60  # wider window during off-peak hours
+# Largest window as a share of an entry's TTL, so a refreshed short-lived
+# entry is not due again right away
+REFRESH_MAX_TTL_SHARE = 0.5
+REFRESH_OFF_PEAK_HOURS = set(range(0, 7))  # local server time
+REFRESH_MAX_PER_HOUR = 60  # upstream checks spent on refreshes
+REFRESH_MIN_POPULARITY = 3  # decayed hit count needed to be refreshed
+
+# Tracing ("none", "jsonl" or "otlp")
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "logs/traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv(
+    "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+TRACING_SERVICE_NAME = "facto-backend"
+TRACING_FLUSH_INTERVAL = 2  # seconds
+
+# Local evidence store
+EVIDENCE_STORE_PATH = os.getenv("EVIDENCE_STORE_PATH", "data/evidence.sqlite3")
+EVIDENCE_BM25_K1 = 1.2
+EVIDENCE_BM25_B = 0.75
+# A stored match must cover this share of the claim's words and reach this
+# BM25 score before the claim is verified without a live web search
+EVIDENCE_MIN_COVERAGE = 0.75
+EVIDENCE_MIN_SCORE = 4.0
+EVIDENCE_MAX_SNIPPETS = 5  # per matching document
+EVIDENCE_MAX_AGE = 30 * 24 * 3600  # seconds before stored evidence is ignored
+
+# Stored results for shareable permalinks
+RESULTS_DIR = os.getenv("RESULTS_DIR", "data/results")
+
+# Graceful shutdown
+DRAIN_TIMEOUT = 30  # seconds in-flight jobs get to finish before being checkpointed
+RECONNECT_DELAY = 5  # seconds clients are asked to wait before reconnecting
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "data/checkpoints")
+
+# Routing of WebSocket messages between workers ("memory" for a single
+# process, "file" for several workers or nodes sharing EVENT_BUS_DIR)
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "memory")
+EVENT_BUS_DIR = os.getenv("EVENT_BUS_DIR", "data/bus")
+EVENT_BUS_POLL_INTERVAL = 0.05  # seconds between inbox checks
+
+# Open upstream connections before the first request (for scale-to-zero)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() in ("1", "true")
+WARMUP_TIMEOUT = 10  # seconds startup may spend warming up
+
+# Admin API for profiling (disabled unless a token is set)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILER_SAMPLE_INTERVAL = 0.01  # seconds between stack samples
+PROFILER_MAX_DURATION = 300  # seconds any profile may run
+LOOP_LAG_INTERVAL = 0.05  # seconds between event loop heartbeats
+LOOP_LAG_THRESHOLD = 0.1  # seconds of lag before a stall is logged
+
+# Token accounting and input budgets
+EXTRACTION_INPUT_TOKEN_BUDGET = 3000  # longer transcripts are trimmed
+# USD per million tokens, used to estimate the cost of model calls
+MODEL_PRICES = {
+    "gpt-4o": {"input": 2.50, "output": 10.00},
+}
+USAGE_MAX_CLIENTS = 1000  # clients with their own usage metrics
+USAGE_MAX_JOBS = 1000  # recent jobs with usage records
+
+# Streaming ingestion of large documents (POST /fact-check/stream)
+STREAM_WINDOW_CHARS = 6000  # about 1500 tokens of text per extraction
+STREAM_MAX_PENDING_WINDOWS = 2  # reading pauses while this many wait
+STREAM_MAX_STATEMENTS = 50  # statements verified per document
+STREAM_VERIFY_CONCURRENCY = 4  # statements verified at the same time
@@ -0,0 +1,71 @@
+"""Per-job deadlines propagated to every stage of the pipeline."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from app.core.config import JOB_DEFAULT_TIMEOUT, JOB_MAX_TIMEOUT, JOB_MIN_TIMEOUT
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a job has run out of time."""
+
+
+class Deadline:
+    """Absolute point in time by which a job must be finished."""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    @classmethod
+    def from_request(cls, timeout: float | None) -> "Deadline":
+        """Deadline for a client-requested timeout, clamped to the server limits."""
+        if timeout is None:
+            timeout = JOB_DEFAULT_TIMEOUT
+        return cls(min(max(timeout, JOB_MIN_TIMEOUT), JOB_MAX_TIMEOUT))
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def stage_timeout(self, share: float = 1.0, cap: float | None = None) -> float:
+        """Timeout for a stage that may use ``share`` of the remaining time."""
+        timeout = self.remaining() * share
+        return min(timeout, cap) if cap is not None else timeout
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if there is no time left for ``stage``."""
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+def current_deadline() -> Deadline | None:
+    """Deadline of the job running in the current context, if any."""
+    return _current_deadline.get()
+
+
+def time_left(default: float) -> float:
+    """Time left for the current job, or ``default`` outside of a job."""
+    deadline = _current_deadline.get()
+    return min(default, deadline.remaining()) if deadline else default
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Make ``deadline`` the current deadline, also for threads started inside."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
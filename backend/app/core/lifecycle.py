@@ -0,0 +1,13 @@
+"""Application lifecycle state shared by the HTTP and WebSocket handlers."""
+
+_draining = False
+
+
+def start_draining():
+    """Stop accepting new jobs because the server is shutting down."""
+    global _draining
+    _draining = True
+
+
+def is_draining() -> bool:
+    return _draining
@@ -0,0 +1,257 @@
+"""On-demand profiling of a running worker.
+
+Everything here is off until switched on through the admin API, and costs a
+single attribute check per job or stage while it is off:
+
+- ``profiler`` samples the stacks of all threads for a time window or for
+  the next N jobs and reports them as folded stacks (the input format of
+  flamegraph.pl and speedscope)
+- ``loop_monitor`` logs the stack of the event loop whenever a callback
+  blocks it for longer than a threshold
+- ``stage_timings`` records wall-clock and CPU time of each pipeline stage
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable
+
+from app.core.config import (
+    LOOP_LAG_INTERVAL,
+    LOOP_LAG_THRESHOLD,
+    PROFILER_MAX_DURATION,
+    PROFILER_SAMPLE_INTERVAL,
+)
+
+logger = logging.getLogger("profiling")
+
+
+def _fold(frame: FrameType | None, thread_name: str) -> str:
+    """Render a stack root first, one ``file:function`` per frame."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names)).replace(" ", "_")
+
+
+class SamplingProfiler:
+    """Periodically sample the stacks of all threads from a background thread."""
+
+    def __init__(self):
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._jobs_left: int | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self,
+        seconds: float | None = None,
+        jobs: int | None = None,
+        interval: float = PROFILER_SAMPLE_INTERVAL,
+    ):
+        """Profile for ``seconds``, or until ``jobs`` more jobs have finished."""
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A profile is already running")
+            self.stacks = Counter()
+            self.samples = 0
+            self._jobs_left = jobs
+            self._stop = threading.Event()
+            # Job-based profiles are capped as well, in case no jobs arrive
+            duration = min(seconds or PROFILER_MAX_DURATION, PROFILER_MAX_DURATION)
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(duration, interval),
+                name="profiler",
+                daemon=True,
+            )
+            self._thread.start()
+        logger.info(f"Profiling started (seconds={seconds}, jobs={jobs})")
+
+    def stop(self):
+        """Stop the running profile, keeping the samples taken so far."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def job_finished(self):
+        """Count a finished job towards a job-based profile."""
+        if self._jobs_left is None:
+            return
+        with self._lock:
+            if self._jobs_left is not None:
+                self._jobs_left -= 1
+                if self._jobs_left <= 0:
+                    self._stop.set()
+
+    def folded(self) -> str:
+        """Samples as folded stacks, one ``stack count`` line each."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def _run(self, duration: float, interval: float):
+        own_id = threading.get_ident()
+        end = time.monotonic() + duration
+        while not self._stop.wait(interval) and time.monotonic() < end:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.stacks[_fold(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.samples += 1
+        self._jobs_left = None
+        logger.info(f"Profiling finished after {self.samples} samples")
+
+
+class LoopLagMonitor:
+    """Detect callbacks that block the event loop and log where it is stuck.
+
+    A task on the loop records a heartbeat; a watchdog thread checks it and,
+    when it is late by more than ``threshold``, logs the loop thread's stack
+    while it is still blocked.
+    """
+
+    def __init__(self):
+        self.threshold = LOOP_LAG_THRESHOLD
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._heartbeat_at = 0.0
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, threshold: float = LOOP_LAG_THRESHOLD):
+        """Start monitoring the running event loop (call from the loop)."""
+        self.threshold = threshold
+        if self.enabled:
+            return
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._heartbeat_at = time.monotonic()
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._stop = threading.Event()
+        threading.Thread(
+            target=self._watch, name="loop-lag-monitor", daemon=True
+        ).start()
+        logger.info(f"Event loop lag monitor started (threshold={threshold}s)")
+
+    def stop(self):
+        """Stop monitoring."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop.set()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            now = time.monotonic()
+            self.max_lag = max(self.max_lag, now - expected)
+            self._heartbeat_at = now
+
+    def _watch(self):
+        reported_at = None
+        while not self._stop.wait(LOOP_LAG_INTERVAL):
+            heartbeat_at = self._heartbeat_at
+            blocked = time.monotonic() - heartbeat_at - LOOP_LAG_INTERVAL
+            # Report each stall once, with the stack of the blocking callback
+            if blocked > self.threshold and reported_at != heartbeat_at:
+                reported_at = heartbeat_at
+                self.stalls += 1
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame else ""
+                logger.warning(f"Event loop blocked for {blocked:.3f}s:\n{stack}")
+
+
+@dataclass
+class StageStats:
+    """Accumulated timings of one pipeline stage."""
+
+    count: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    max_wall: float = 0.0
+
+
+class StageTimings:
+    """Wall-clock and CPU time spent in each stage of ``process_request``.
+
+    CPU time is that of the thread running the stage, so work the stage hands
+    to other threads (such as hedged transcript requests) is not included.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._stats: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    async def measure(self, stage: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking stage in a thread and record its timings."""
+        cpu = 0.0
+
+        def run():
+            nonlocal cpu
+            start = time.thread_time()
+            try:
+                return func(*args)
+            finally:
+                cpu = time.thread_time() - start
+
+        start = time.perf_counter()
+        try:
+            return await asyncio.to_thread(run)
+        finally:
+            self.record(stage, time.perf_counter() - start, cpu)
+
+    def record(self, stage: str, wall: float, cpu: float):
+        with self._lock:
+            stats = self._stats.setdefault(stage, StageStats())
+            stats.count += 1
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.max_wall = max(stats.max_wall, wall)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Totals per stage, with the share of wall-clock time spent on CPU."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": stats.count,
+                    "wallSeconds": stats.wall,
+                    "cpuSeconds": stats.cpu,
+                    "cpuShare": stats.cpu / stats.wall if stats.wall else 0.0,
+                    "maxWallSeconds": stats.max_wall,
+                }
+                for stage, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+profiler = SamplingProfiler()
+loop_monitor = LoopLagMonitor()
+stage_timings = StageTimings()
@@ -0,0 +1,73 @@
+"""Local token counting for prompts sent to the model.
+
+Uses tiktoken when it is installed (optional ``tokens`` extra) and its
+encoding can be loaded, and a character-based estimate otherwise.
+"""
+
+import logging
+import re
+import threading
+from typing import Any
+
+from app.core.config import DEFAULT_MODEL
+
+logger = logging.getLogger("tokens")
+
+# Tokens the chat format adds around each message
+_MESSAGE_OVERHEAD = 4
+
+_encodings: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None to fall back to estimates."""
+    if model not in _encodings:
+        with _lock:
+            if model not in _encodings:
+                _encodings[model] = _load_encoding(model)
+    return _encodings[model]
+
+
+def _load_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline
+        logger.warning(f"Could not load tiktoken encoding, estimating: {str(e)}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: about four characters or 0.75 words per token.
+
+    Errs on the high side so that trimmed prompts stay within their budget.
+    """
+    words = len(re.findall(r"\w+", text))
+    punctuation = len(re.findall(r"[^\w\s]", text))
+    return max(len(text) // 4, round(words / 0.75) + punctuation)
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Number of tokens the model will see for ``text``."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_input_tokens(
+    messages: list[dict[str, Any]], model: str = DEFAULT_MODEL
+) -> int:
+    """Number of input tokens of a list of chat messages."""
+    return sum(
+        count_tokens(str(message.get("content", "")), model) + _MESSAGE_OVERHEAD
+        for message in messages
+    )
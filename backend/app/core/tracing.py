@@ -0,0 +1,255 @@
+"""Lightweight OpenTelemetry-compatible tracing.
+
+Spans are collected in-process and exported in the background either as
+OTLP/JSON to a local collector or as one JSON object per line to a file. When
+tracing is disabled ``start_span`` hands out a shared no-op span, so
+instrumented code costs next to nothing.
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.core.config import (
+    TRACING_EXPORTER,
+    TRACING_FLUSH_INTERVAL,
+    TRACING_JSONL_PATH,
+    TRACING_OTLP_ENDPOINT,
+    TRACING_SERVICE_NAME,
+)
+
+logger = logging.getLogger("tracing")
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(self, name: str, parent: "Span | None" = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_time = time.time_ns()
+        self.end_time: int | None = None
+        self.attributes: dict[str, Any] = {}
+        self.status = "OK"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = str(error)
+        self.attributes["exception.type"] = type(error).__name__
+
+    def to_dict(self) -> dict[str, Any]:
+        """Span as a flat JSON object using OpenTelemetry field names."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_time,
+            "endTimeUnixNano": self.end_time,
+            "durationMs": ((self.end_time or self.start_time) - self.start_time) / 1e6,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """Stand-in used when tracing is disabled."""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: list[Span]):
+        with self.path.open("a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OtlpHttpSpanExporter:
+    """Send finished spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.endpoint = endpoint
+        self.service_name = service_name
+
+    def export(self, spans: list[Span]):
+        import requests
+
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.core.tracing"},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        requests.post(self.endpoint, json=payload, timeout=5).raise_for_status()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    otlp_span = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {
+            "code": 2 if span.status == "ERROR" else 1,
+            "message": span.status_message,
+        },
+    }
+    if span.parent_span_id:
+        otlp_span["parentSpanId"] = span.parent_span_id
+    return otlp_span
+
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them from a background thread."""
+
+    def __init__(self, exporter, flush_interval: float = TRACING_FLUSH_INTERVAL):
+        self.exporter = exporter
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=10_000)
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            logger.warning("Span queue full, dropping span")
+
+    def flush(self):
+        spans = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if spans:
+            try:
+                self.exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Failed to export {len(spans)} spans: {str(e)}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+def _create_processor() -> BatchSpanProcessor | None:
+    if TRACING_EXPORTER == "jsonl":
+        return BatchSpanProcessor(JsonlSpanExporter(TRACING_JSONL_PATH))
+    if TRACING_EXPORTER == "otlp":
+        return BatchSpanProcessor(
+            OtlpHttpSpanExporter(TRACING_OTLP_ENDPOINT, TRACING_SERVICE_NAME)
+        )
+    return None
+
+
+_processor = _create_processor()
+
+
+def tracing_enabled() -> bool:
+    return _processor is not None
+
+
+def current_span() -> Span | _NoopSpan:
+    """The innermost active span, or a no-op span outside of a trace."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def start_span(
+    name: str, attributes: dict[str, Any] | None = None
+) -> Iterator[Span | _NoopSpan]:
+    """Start a span as a child of the current one (or a new root span)."""
+    if _processor is None:
+        yield _NOOP_SPAN
+        return
+
+    span = Span(name, parent=_current_span.get())
+    if attributes:
+        span.set_attributes(attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_time = time.time_ns()
+        _processor.on_end(span)
+
+
+def shutdown_tracing():
+    """Export all spans that are still queued."""
+    if _processor is not None:
+        _processor.flush()
@@ -0,0 +1,246 @@
+"""Token and cost accounting per job and per client.
+
+Model calls record their usage against the job running in the current
+context (see ``UsageTracker.job``). Totals per operation and the per-job
+histogram are exposed in the Prometheus text format; usage per client and per
+job is only listed through the admin API, since client ids give access to a
+client's WebSocket messages.
+"""
+
+import asyncio
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from app.core.config import MODEL_PRICES, USAGE_MAX_CLIENTS, USAGE_MAX_JOBS
+
+# Upper bounds of the tokens-per-job histogram buckets
+JOB_TOKEN_BUCKETS = (1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+@dataclass
+class Usage:
+    """Tokens used and what they cost."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    estimated_input_tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, other: "Usage"):
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.estimated_input_tokens += other.estimated_input_tokens
+        self.cost += other.cost
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "inputTokens": self.input_tokens,
+            "outputTokens": self.output_tokens,
+            "estimatedInputTokens": self.estimated_input_tokens,
+            "costUsd": self.cost,
+        }
+
+
+@dataclass
+class JobUsage:
+    """Usage of one job."""
+
+    job_id: str
+    client_id: str
+    usage: Usage = field(default_factory=Usage)
+    finished: bool = False
+
+
+_current_job: ContextVar[JobUsage | None] = ContextVar("current_job", default=None)
+
+
+class UsageTracker:
+    """Thread-safe totals of model usage.
+
+    Totals per operation and model are kept for the lifetime of the process.
+    Per-client totals and per-job records are kept for the most recently
+    active clients and jobs only, so memory stays bounded.
+    """
+
+    def __init__(
+        self, max_clients: int = USAGE_MAX_CLIENTS, max_jobs: int = USAGE_MAX_JOBS
+    ):
+        self.max_clients = max_clients
+        self.max_jobs = max_jobs
+        self._operations: dict[tuple[str, str], Usage] = {}
+        self._clients: OrderedDict[str, Usage] = OrderedDict()
+        self._jobs: OrderedDict[str, JobUsage] = OrderedDict()
+        self._job_buckets: Counter[float] = Counter()
+        self._job_count = 0
+        self._job_tokens = 0
+        self._trimmed = Usage()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def job(self, job_id: str, client_id: str) -> Iterator[JobUsage]:
+        """Attribute model calls made in this context to a job."""
+        with self._lock:
+            job = self._jobs.get(job_id) or JobUsage(job_id, client_id)
+            # A resumed job may be continued by a new connection
+            job.client_id = client_id
+            self._remember(self._jobs, job_id, job, self.max_jobs)
+
+        token = _current_job.set(job)
+        cancelled = False
+        try:
+            yield job
+        except asyncio.CancelledError:
+            # A checkpointed job comes back under the same id when it is
+            # resumed, so it is only counted once it runs to the end
+            cancelled = True
+            raise
+        finally:
+            _current_job.reset(token)
+            if not cancelled:
+                self._finish(job)
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        estimated_input_tokens: int,
+    ):
+        """Record one model call against the current job and client."""
+        prices = MODEL_PRICES.get(model, {"input": 0.0, "output": 0.0})
+        usage = Usage(
+            calls=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            estimated_input_tokens=estimated_input_tokens,
+            cost=(input_tokens * prices["input"] + output_tokens * prices["output"])
+            / 1_000_000,
+        )
+
+        job = _current_job.get()
+        with self._lock:
+            self._operations.setdefault((operation, model), Usage()).add(usage)
+            if job is not None:
+                job.usage.add(usage)
+                client = self._clients.get(job.client_id) or Usage()
+                client.add(usage)
+                self._remember(self._clients, job.client_id, client, self.max_clients)
+
+    def record_trim(self, original_tokens: int, trimmed_tokens: int):
+        """Record a prompt that was trimmed to fit its token budget."""
+        with self._lock:
+            self._trimmed.calls += 1
+            self._trimmed.estimated_input_tokens += original_tokens - trimmed_tokens
+
+    def recent_jobs(self) -> list[JobUsage]:
+        """Usage of the most recent jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def recent_clients(self) -> list[tuple[str, Usage]]:
+        """Usage of the most recently active clients, newest first."""
+        with self._lock:
+            return list(reversed(self._clients.items()))
+
+    def render_prometheus(self) -> str:
+        """All totals in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            metric("factcheck_llm_calls_total", "counter", "Model calls.")
+            for (operation, model), usage in self._operations.items():
+                labels = f'operation="{operation}",model="{model}"'
+                lines.append(f"factcheck_llm_calls_total{{{labels}}} {usage.calls}")
+
+            metric(
+                "factcheck_llm_tokens_total", "counter", "Tokens used by model calls."
+            )
+            for (operation, model), usage in self._operations.items():
+                labels = f'operation="{operation}",model="{model}"'
+                lines.append(
+                    f'factcheck_llm_tokens_total{{{labels},kind="input"}} '
+                    f"{usage.input_tokens}"
+                )
+                lines.append(
+                    f'factcheck_llm_tokens_total{{{labels},kind="output"}} '
+                    f"{usage.output_tokens}"
+                )
+
+            metric(
+                "factcheck_llm_estimated_input_tokens_total",
+                "counter",
+                "Input tokens counted locally before sending.",
+            )
+            for (operation, model), usage in self._operations.items():
+                labels = f'operation="{operation}",model="{model}"'
+                lines.append(
+                    f"factcheck_llm_estimated_input_tokens_total{{{labels}}} "
+                    f"{usage.estimated_input_tokens}"
+                )
+
+            metric("factcheck_llm_cost_usd_total", "counter", "Token cost in USD.")
+            for (operation, model), usage in self._operations.items():
+                labels = f'operation="{operation}",model="{model}"'
+                lines.append(f"factcheck_llm_cost_usd_total{{{labels}}} {usage.cost}")
+
+            metric("factcheck_job_tokens", "histogram", "Tokens used per job.")
+            cumulative = 0
+            for bound in JOB_TOKEN_BUCKETS:
+                cumulative += self._job_buckets[bound]
+                lines.append(
+                    f'factcheck_job_tokens_bucket{{le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'factcheck_job_tokens_bucket{{le="+Inf"}} {self._job_count}')
+            lines.append(f"factcheck_job_tokens_sum {self._job_tokens}")
+            lines.append(f"factcheck_job_tokens_count {self._job_count}")
+
+            metric(
+                "factcheck_prompts_trimmed_total",
+                "counter",
+                "Prompts trimmed to fit the input token budget.",
+            )
+            lines.append(f"factcheck_prompts_trimmed_total {self._trimmed.calls}")
+            metric(
+                "factcheck_trimmed_tokens_total",
+                "counter",
+                "Input tokens removed by trimming prompts.",
+            )
+            lines.append(
+                f"factcheck_trimmed_tokens_total {self._trimmed.estimated_input_tokens}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def _finish(self, job: JobUsage):
+        tokens = job.usage.input_tokens + job.usage.output_tokens
+        with self._lock:
+            if job.finished:
+                return
+            job.finished = True
+            self._job_count += 1
+            self._job_tokens += tokens
+            bound = next((b for b in JOB_TOKEN_BUCKETS if tokens <= b), None)
+            if bound is not None:
+                self._job_buckets[bound] += 1
+
+    @staticmethod
+    def _remember(table: OrderedDict, key: str, value, limit: int):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > limit:
+            table.popitem(last=False)
+
+
+usage_tracker = UsageTracker()
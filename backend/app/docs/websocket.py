@@ -12,6 +12,9 @@ wss://{host}/ws/fact-check/{client_id}
 ```
 
 - **client_id**: A unique identifier for the client connection. If not provided or "undefined", a UUID will be generated.
+- **encoding** (query, optional): `json` (default) or `msgpack` for binary MessagePack frames.
+- **delta** (query, optional): `1` to send statements and sources once and refer to them
+  by number afterwards (defined in a `defs` field the first time they are used).
 
 ### Message Exchange
 
@@ -19,7 +22,16 @@ wss://{host}/ws/fact-check/{client_id}
    Send a JSON message with the content to fact check:
    ```json
    {
-       "data": "Text content or URL to fact check"
+       "data": "Text content or URL to fact check",
+       "timeout": 60
+   }
+   ```
+   `timeout` (optional) is the time budget in seconds, clamped to the server limits.
+
+   To continue a job interrupted by a server restart, send its job id instead:
+   ```json
+   {
+       "resume": "7b6de393bbc2437897b2be12f6c5e680"
    }
    ```
 
@@ -86,7 +98,23 @@ wss://{host}/ws/fact-check/{client_id}
                  "reason": "Contradicted by reliable sources.",
                  "sources": ["https://example.com/source3"]
              }
-         ]
+         ],
+         "timedOut": false,
+         "resultId": "4f1c2d0e9b7a6c5d4e3f2a1b0c9d8e7f"
+     }
+     ```
+
+   - **Server Restarting:**
+     Sent before the server closes the connection (code 1012) on shutdown.
+     Reconnect after `retryAfter` seconds and resume the listed jobs.
+     Requests sent while jobs of the connection are still being wound down
+     get an error, and the connection stays open until this message.
+     ```json
+     {
+         "type": "reconnect",
+         "message": "Server is restarting, please reconnect",
+         "retryAfter": 5,
+         "jobIds": ["7b6de393bbc2437897b2be12f6c5e680"]
      }
      ```
 
@@ -1,13 +1,43 @@
 """Main application module."""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.admin import router as admin_router
+from app.api.dependencies import get_content_service, get_event_bus
 from app.api.fact_check import router as fact_check_router
+from app.api.metrics import router as metrics_router
+from app.api.results import router as results_router
+from app.core.config import WARMUP_ON_STARTUP
+from app.core.tracing import shutdown_tracing
 from app.docs.websocket import WEBSOCKET_DESCRIPTION
+from app.services.verdict_refresher import VerdictRefresher
+from app.services.warmup import warm_up
+from app.websockets.fact_check import deliver_message
 from app.websockets.fact_check import router as ws_router
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background tasks for the lifetime of the application."""
+    if WARMUP_ON_STARTUP:
+        await warm_up(get_content_service())
+
+    event_bus = get_event_bus()
+    await event_bus.start(deliver_message)
+    refresher = VerdictRefresher(get_content_service())
+    refresh_task = asyncio.create_task(refresher.run())
+
+    yield
+
+    refresh_task.cancel()
+    await event_bus.stop()
+    shutdown_tracing()
+
+
 def create_app() -> FastAPI:
     """Create and configure FastAPI application."""
     app = FastAPI(
@@ -15,6 +45,7 @@ def create_app() -> FastAPI:
         description="API for checking factual accuracy of content\n\n"
         + WEBSOCKET_DESCRIPTION,
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # Set up CORS
@@ -28,7 +59,10 @@ def create_app() -> FastAPI:
 
     # Include routers directly
     app.include_router(fact_check_router, tags=["fact-check"])
+    app.include_router(results_router, tags=["results"])
     app.include_router(ws_router)
+    app.include_router(admin_router, tags=["admin"])
+    app.include_router(metrics_router, tags=["metrics"])
 
     return app
 
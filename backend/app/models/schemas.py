@@ -2,13 +2,17 @@
 
 from typing import List, Literal
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
+
+from app.core.config import LOOP_LAG_THRESHOLD
 
 
 class BodyData(BaseModel):
     """Request body for fake-check endpoint."""
 
     data: HttpUrl | str
+    # Requested time budget in seconds, clamped to the server limits
+    timeout: float | None = None
 
 
 class StatementList(BaseModel):
@@ -25,6 +29,34 @@ class StatementCheck(BaseModel):
     sources: List[str]
 
 
+class Evidence(BaseModel):
+    """A source cited while verifying a statement."""
+
+    url: str
+    title: str = ""
+    snippet: str = ""
+
+
+class ProfileRequest(BaseModel):
+    """Request body to start a sampling profile."""
+
+    seconds: float | None = Field(None, gt=0)
+    jobs: int | None = Field(None, gt=0)
+
+
+class ToggleRequest(BaseModel):
+    """Request body to switch a diagnostic on or off."""
+
+    enabled: bool
+
+
+class LoopMonitorRequest(ToggleRequest):
+    """Request body to switch the event loop lag monitor on or off."""
+
+    # Lag in seconds above which a stall is logged
+    threshold: float = Field(LOOP_LAG_THRESHOLD, gt=0)
+
+
 class Statement:
     """Complete statement information including check results."""
 
@@ -0,0 +1,46 @@
+"""Checkpoints of unfinished jobs so another instance can resume them."""
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from app.core.config import CHECKPOINT_DIR
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class CheckpointStore:
+    """Store job checkpoints as files in a directory shared by all instances."""
+
+    def __init__(self, directory: str = CHECKPOINT_DIR):
+        self.directory = Path(directory)
+
+    def save(self, job_id: str, checkpoint: dict[str, Any]):
+        """Write a checkpoint, replacing any earlier one for the same job."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as f:
+            json.dump(checkpoint, f)
+        os.replace(f.name, self.directory / f"{job_id}.json")
+
+    def claim(self, job_id: str) -> dict[str, Any] | None:
+        """Take a checkpoint out of the store so that only one instance resumes it."""
+        if not _JOB_ID_RE.match(job_id):
+            return None
+
+        path = self.directory / f"{job_id}.json"
+        claimed = path.with_suffix(f".{os.getpid()}.claimed")
+        try:
+            # Renaming is atomic, so concurrent claims cannot both succeed
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+
+        try:
+            return json.loads(claimed.read_text(encoding="utf-8"))
+        finally:
+            claimed.unlink(missing_ok=True)
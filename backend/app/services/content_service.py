@@ -3,18 +3,56 @@
 from typing import List
 from urllib.parse import urlparse
 
-import requests
 from pydantic import HttpUrl
 
-from app.core.config import RAPID_API_KEY
+from app.core.config import EVIDENCE_MIN_COVERAGE, EVIDENCE_MIN_SCORE
+from app.core.deadline import DeadlineExceeded
+from app.core.tracing import current_span, start_span
+from app.models.schemas import StatementCheck
+from app.services.evidence_store import EvidenceStore
 from app.services.openai_service import OpenAIService
+from app.services.statement_dedup import group_statements
+from app.services.transcript_service import TranscriptService
+from app.services.verdict_cache import VerdictCache, is_volatile
+
+
+def statement_result(
+    statement: str, statement_check: StatementCheck, sources: list[str]
+) -> dict:
+    """Result entry for a verified statement."""
+    return {
+        "statement": statement,
+        "probability": statement_check.probability,
+        "reason": statement_check.reason,
+        "sources": sources,
+    }
+
+
+def timed_out_result(statement: str) -> dict:
+    """Result entry for a statement that could not be verified in time."""
+    return {
+        "statement": statement,
+        "probability": "uncertain",
+        "reason": "Verification timed out before a verdict was reached.",
+        "sources": [],
+        "timedOut": True,
+    }
 
 
 class ContentService:
     """Service for processing content from different sources."""
 
-    def __init__(self, openai_service: OpenAIService):
+    def __init__(
+        self,
+        openai_service: OpenAIService,
+        transcript_service: TranscriptService,
+        verdict_cache: VerdictCache,
+        evidence_store: EvidenceStore,
+    ):
         self.openai_service = openai_service
+        self.transcript_service = transcript_service
+        self.verdict_cache = verdict_cache
+        self.evidence_store = evidence_store
 
     def process_content(self, data: str | HttpUrl) -> List[dict]:
         """Process content from text or URL and return fact-check results."""
@@ -64,45 +102,67 @@ class ContentService:
         return self._check_statements(statements)
 
     def _get_instagram_transcript(self, url: HttpUrl) -> str:
-        instagram_transcript_tool = (
-            "https://instagram-video-transcript.p.rapidapi.com/transcribe-ig-video"
-        )
-
-        payload = {"url": url}
-        headers = {
-            "x-rapidapi-key": RAPID_API_KEY,
-            "x-rapidapi-host": "instagram-video-transcript.p.rapidapi.com",
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
-
-        response = requests.post(
-            instagram_transcript_tool, data=payload, headers=headers
-        )
-
-        data = response.json()
-        transcript = data["response"]["text"]
-
-        return transcript
+        """Get transcript from Instagram video."""
+        return self.transcript_service.get_transcript("instagram", str(url))
 
     def _get_tiktok_transcript(self, url: HttpUrl) -> str:
         """Get transcript from TikTok video."""
-        tiktok_transcript_tool = (
-            "https://tiktok-transcript.p.rapidapi.com/transcribe-tiktok-audio"
+        return self.transcript_service.get_transcript("tiktok", str(url))
+
+    def check_statement(self, statement: str) -> tuple[StatementCheck, list[str]]:
+        """Check a statement, answering from the verdict cache when possible."""
+        with start_span("check_statement") as span:
+            with start_span("cache.lookup") as cache_span:
+                cached = self.verdict_cache.get(statement)
+                cache_span.set_attribute("cache.hit", cached is not None)
+            span.set_attribute("cache.hit", cached is not None)
+            if cached is not None:
+                return cached
+
+            statement_check, sources = self.verify_statement(statement)
+            self.verdict_cache.set(statement, statement_check, sources)
+            span.set_attributes(
+                {
+                    "verdict.probability": statement_check.probability,
+                    "verdict.sources": len(sources),
+                }
+            )
+            return statement_check, sources
+
+    def verify_statement(
+        self, statement: str, use_evidence_store: bool = True
+    ) -> tuple[StatementCheck, list[str]]:
+        """Verify a statement without looking at the verdict cache.
+
+        If the evidence store holds strong, recent evidence for the claim, it is
+        checked against that evidence only. Web search is used when there is no
+        such evidence, the evidence is inconclusive or the claim is about the
+        present, and its citations are added to the store.
+        """
+        span = current_span()
+        if use_evidence_store and not is_volatile(statement):
+            matches = [
+                match
+                for match in self.evidence_store.search(statement)
+                if match.coverage >= EVIDENCE_MIN_COVERAGE
+                and match.score >= EVIDENCE_MIN_SCORE
+            ]
+            if matches:
+                statement_check, sources = (
+                    self.openai_service.check_statement_with_evidence(
+                        statement, matches
+                    )
+                )
+                span.set_attribute("evidence.local", True)
+                if statement_check.probability != "uncertain":
+                    return statement_check, sources
+
+        statement_check, sources, evidence = self.openai_service.check_statement(
+            statement
         )
-
-        payload = {"url": url}
-        headers = {
-            "x-rapidapi-key": RAPID_API_KEY,
-            "x-rapidapi-host": "tiktok-transcript.p.rapidapi.com",
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
-
-        response = requests.post(tiktok_transcript_tool, data=payload, headers=headers)
-
-        data = response.json()
-        transcript = data["response"]["text"]
-
-        return transcript
+        if evidence and statement_check.probability != "uncertain":
+            self.evidence_store.add(statement, statement_check, evidence)
+        return statement_check, sources
 
     def _check_statements(self, statements: List[str]) -> List[dict]:
         """Check multiple statements."""
@@ -111,15 +171,23 @@ class ContentService:
 
         statements = statements[:MAX_STATEMENTS]
 
+        # Verify one representative per group of near-duplicate statements
+        representatives = group_statements(statements)
+        checks = {}
+
         results = []
-        for statement in statements:
-            statement_check, sources = self.openai_service.check_statement(statement)
-            result = {
-                "statement": statement,
-                "probability": statement_check.probability,
-                "reason": statement_check.reason,
-                "sources": sources,
-            }
-            results.append(result)
+        for statement, representative in zip(statements, representatives):
+            if representative not in checks:
+                try:
+                    checks[representative] = self.check_statement(
+                        statements[representative]
+                    )
+                except DeadlineExceeded:
+                    checks[representative] = None
+
+            if checks[representative] is None:
+                results.append(timed_out_result(statement))
+            else:
+                results.append(statement_result(statement, *checks[representative]))
 
         return results
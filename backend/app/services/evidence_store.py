@@ -0,0 +1,160 @@
+"""On-disk store of verification evidence with BM25 retrieval."""
+
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import (
+    EVIDENCE_BM25_B,
+    EVIDENCE_BM25_K1,
+    EVIDENCE_MAX_AGE,
+    EVIDENCE_STORE_PATH,
+)
+from app.core.tracing import start_span
+from app.models.schemas import Evidence, StatementCheck
+from app.services.statement_dedup import content_words
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    statement TEXT NOT NULL,
+    probability TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    evidence TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class EvidenceMatch:
+    """A stored verification that matches a query."""
+
+    statement: str
+    probability: str
+    reason: str
+    evidence: list[Evidence]
+    score: float
+    coverage: float  # share of query terms found in the document
+
+
+class EvidenceStore:
+    """Inverted index over the evidence gathered for verified statements.
+
+    Each verification becomes one document (statement, verdict reason and the
+    cited snippets) that is indexed term by term, so new documents can be
+    added without rebuilding the index.
+    """
+
+    def __init__(self, path: str = EVIDENCE_STORE_PATH):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def add(
+        self, statement: str, statement_check: StatementCheck, evidence: list[Evidence]
+    ):
+        """Index the evidence used to verify a statement."""
+        text = " ".join(
+            [statement, statement_check.reason]
+            + [f"{item.title} {item.snippet}" for item in evidence]
+        )
+        terms = Counter(content_words(text))
+        if not terms:
+            return
+
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO documents "
+                "(statement, probability, reason, evidence, length, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    statement,
+                    statement_check.probability,
+                    statement_check.reason,
+                    json.dumps([item.model_dump() for item in evidence]),
+                    sum(terms.values()),
+                    time.time(),
+                ),
+            )
+            self._connection.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(term, cursor.lastrowid, tf) for term, tf in terms.items()],
+            )
+
+    def search(self, query: str, limit: int = 3) -> list[EvidenceMatch]:
+        """Return the best matching recent documents for a query by BM25 score."""
+        terms = set(content_words(query))
+        if not terms:
+            return []
+        oldest = time.time() - EVIDENCE_MAX_AGE
+
+        with start_span("evidence.search") as span, self._lock:
+            count, average_length = self._connection.execute(
+                "SELECT COUNT(*), AVG(length) FROM documents WHERE created_at >= ?",
+                (oldest,),
+            ).fetchone()
+            if not count:
+                return []
+
+            scores: Counter[int] = Counter()
+            matched: Counter[int] = Counter()
+            for term in terms:
+                rows = self._connection.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN documents d ON d.id = p.doc_id "
+                    "WHERE p.term = ? AND d.created_at >= ?",
+                    (term, oldest),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc_id, tf, length in rows:
+                    norm = (
+                        1 - EVIDENCE_BM25_B + EVIDENCE_BM25_B * length / average_length
+                    )
+                    scores[doc_id] += (
+                        idf
+                        * tf
+                        * (EVIDENCE_BM25_K1 + 1)
+                        / (tf + EVIDENCE_BM25_K1 * norm)
+                    )
+                    matched[doc_id] += 1
+
+            matches = []
+            for doc_id, score in scores.most_common(limit):
+                statement, probability, reason, evidence = self._connection.execute(
+                    "SELECT statement, probability, reason, evidence "
+                    "FROM documents WHERE id = ?",
+                    (doc_id,),
+                ).fetchone()
+                matches.append(
+                    EvidenceMatch(
+                        statement=statement,
+                        probability=probability,
+                        reason=reason,
+                        evidence=[Evidence(**item) for item in json.loads(evidence)],
+                        score=score,
+                        coverage=matched[doc_id] / len(terms),
+                    )
+                )
+
+            span.set_attribute("evidence.matches", len(matches))
+            if matches:
+                span.set_attribute("evidence.top_score", matches[0].score)
+            return matches
@@ -1,26 +1,90 @@
 """Service for interacting with OpenAI API."""
 
-import requests
-from openai import OpenAI
-from openai.types.responses import ParsedResponse
+import threading
+from typing import TYPE_CHECKING
 
-from app.core.config import DEFAULT_MODEL, OPENAI_API_KEY
-from app.models.schemas import StatementCheck, StatementList
+from app.core.config import (
+    DEFAULT_MODEL,
+    EVIDENCE_MAX_SNIPPETS,
+    EXTRACTION_INPUT_TOKEN_BUDGET,
+    OPENAI_API_KEY,
+)
+from app.core.deadline import DeadlineExceeded, current_deadline, time_left
+from app.core.tokens import count_input_tokens, count_tokens
+from app.core.tracing import current_span, start_span
+from app.core.usage import usage_tracker
+from app.models.schemas import Evidence, StatementCheck, StatementList
+from app.services.evidence_store import EvidenceMatch
+from app.services.prompt_trimmer import trim_to_budget
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.responses import ParsedResponse
 
 
 def is_website_live(url):
-    try:
-        response = requests.get(url, timeout=5)
-        return response.status_code == 200
-    except requests.RequestException:
-        return False
+    import requests
+
+    with start_span("source.liveness_check", {"url": url}) as span:
+        timeout = time_left(5)
+        if timeout <= 0:
+            return False
+        try:
+            response = requests.get(url, timeout=timeout)
+            span.set_attribute("http.status_code", response.status_code)
+            return response.status_code == 200
+        except requests.RequestException as e:
+            span.set_attribute("error", str(e))
+            return False
+
+
+def _record_usage(
+    span, operation: str, response: "ParsedResponse", estimated_input_tokens: int
+):
+    """Attach model and token usage of a response to a span and the usage totals."""
+    span.set_attributes(
+        {
+            "gen_ai.request.model": DEFAULT_MODEL,
+            "gen_ai.usage.estimated_input_tokens": estimated_input_tokens,
+        }
+    )
+    input_tokens, output_tokens = estimated_input_tokens, 0
+    if response.usage is not None:
+        input_tokens = response.usage.input_tokens
+        output_tokens = response.usage.output_tokens
+        span.set_attributes(
+            {
+                "gen_ai.usage.input_tokens": input_tokens,
+                "gen_ai.usage.output_tokens": output_tokens,
+            }
+        )
+    usage_tracker.record(
+        operation, DEFAULT_MODEL, input_tokens, output_tokens, estimated_input_tokens
+    )
 
 
 class OpenAIService:
     """Service for OpenAI API operations."""
 
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self._client: "OpenAI | None" = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> "OpenAI":
+        """OpenAI client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # Importing openai takes about half of the startup time
+                    from openai import OpenAI
+
+                    self._client = OpenAI(api_key=OPENAI_API_KEY)
+        return self._client
+
+    def warm_up(self, timeout: float):
+        """Create the client and open a connection to the API."""
+        self.client.with_options(timeout=timeout, max_retries=0).models.list()
 
     def extract_statements(self, text: str) -> list[str]:
         """Extract statements from text using OpenAI."""
@@ -36,22 +100,40 @@ class OpenAIService:
         Return only a list of strings.
         """
 
-        response = self.client.responses.parse(
-            model=DEFAULT_MODEL,
-            input=[
-                {
-                    "role": "system",
-                    "content": prompt,
-                },
-                {
-                    "role": "user",
-                    "content": text,
-                },
-            ],
-            text_format=StatementList,
-            stream=False,
-            max_output_tokens=1000,
-        )
+        with start_span("openai.extract_statements") as span:
+            # Long transcripts are cut down to their most claim-dense parts
+            original_tokens = count_tokens(text)
+            if original_tokens > EXTRACTION_INPUT_TOKEN_BUDGET:
+                text = trim_to_budget(text, EXTRACTION_INPUT_TOKEN_BUDGET)
+                trimmed_tokens = count_tokens(text)
+                usage_tracker.record_trim(original_tokens, trimmed_tokens)
+                span.set_attributes(
+                    {
+                        "input.original_tokens": original_tokens,
+                        "input.trimmed_tokens": trimmed_tokens,
+                    }
+                )
+
+            response = self._parse(
+                "extract_statements",
+                model=DEFAULT_MODEL,
+                input=[
+                    {
+                        "role": "system",
+                        "content": prompt,
+                    },
+                    {
+                        "role": "user",
+                        "content": text,
+                    },
+                ],
+                text_format=StatementList,
+                stream=False,
+                max_output_tokens=1000,
+            )
+            span.set_attribute(
+                "statements.count", len(response.output_parsed.statements)
+            )
 
         statements = response.output_parsed.statements
 
@@ -59,8 +141,13 @@ class OpenAIService:
 
         return statements
 
-    def check_statement(self, statement: str) -> tuple[StatementCheck, list[str]]:
-        """Check if a statement is true using web search."""
+    def check_statement(
+        self, statement: str
+    ) -> tuple[StatementCheck, list[str], list[Evidence]]:
+        """Check if a statement is true using web search.
+
+        Also returns the cited evidence so it can be reused for later checks.
+        """
         prompt = """
         You are a professional, neutral fact-checker conducting an online search.
         Fact-check the following statement strictly according to these rules:
@@ -88,25 +175,28 @@ class OpenAIService:
         11. JSON output language should match the input language from the statement.
         """
 
-        response = self.client.responses.parse(
-            model=DEFAULT_MODEL,
-            input=[
-                {
-                    "role": "system",
-                    "content": prompt,
-                },
-                {
-                    "role": "user",
-                    "content": statement,
-                },
-            ],
-            text_format=StatementCheck,
-            tools=[{"type": "web_search_preview"}],
-            stream=False,
-            max_output_tokens=600,
-        )
+        with start_span("openai.check_statement"):
+            response = self._parse(
+                "check_statement",
+                model=DEFAULT_MODEL,
+                input=[
+                    {
+                        "role": "system",
+                        "content": prompt,
+                    },
+                    {
+                        "role": "user",
+                        "content": statement,
+                    },
+                ],
+                text_format=StatementCheck,
+                tools=[{"type": "web_search_preview"}],
+                stream=False,
+                max_output_tokens=600,
+            )
 
-        sources = self._get_sources(response)
+        evidence = self._get_citations(response)
+        sources = [item.url for item in evidence]
         statement_response = response.output_parsed
 
         # merge sources from the response and the parsed response
@@ -119,16 +209,99 @@ class OpenAIService:
                         sources.append(source)
             sources.extend(statement_response.sources)
 
+        return statement_response, sources, evidence
+
+    def check_statement_with_evidence(
+        self, statement: str, matches: list[EvidenceMatch]
+    ) -> tuple[StatementCheck, list[str]]:
+        """Check a statement against stored evidence only, without web search."""
+        prompt = """
+        You are a professional, neutral fact-checker.
+        Fact-check the following statement using ONLY the evidence provided below.
+        1. Do not use any knowledge that is not supported by the evidence.
+        2. Assign probability:
+           - "high" = confirmed by the evidence
+           - "low" = contradicted by the evidence
+           - "uncertain" = the evidence does not clearly confirm or contradict the statement
+        3. Stay fully neutral and keep the explanation to 3 sentences at most.
+        4. List only source URLs from the evidence that support your decision.
+        5. The output language should match the input language from the statement.
+        """
+
+        evidence = [
+            f"Previously checked: {match.statement}\nFinding: {match.reason}"
+            for match in matches
+        ]
+        for match in matches:
+            for item in match.evidence[:EVIDENCE_MAX_SNIPPETS]:
+                evidence.append(f"Source: {item.url}\n{item.title}\n{item.snippet}")
+
+        with start_span("openai.check_statement_with_evidence"):
+            response = self._parse(
+                "check_statement_with_evidence",
+                model=DEFAULT_MODEL,
+                input=[
+                    {
+                        "role": "system",
+                        "content": prompt,
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Statement: {statement}\n\nEvidence:\n"
+                        + "\n\n".join(evidence),
+                    },
+                ],
+                text_format=StatementCheck,
+                stream=False,
+                max_output_tokens=600,
+            )
+
+        statement_response = response.output_parsed
+        known_sources = {item.url for match in matches for item in match.evidence}
+        sources = [
+            source for source in statement_response.sources if source in known_sources
+        ]
         return statement_response, sources
 
-    def _get_sources(self, response: ParsedResponse) -> list[str]:
-        """Extract source URLs from OpenAI response."""
-        sources = []
+    def _parse(self, operation: str, **kwargs) -> "ParsedResponse":
+        """Call the responses API and account for the tokens it used."""
+        estimated_input_tokens = count_input_tokens(kwargs["input"])
+        response = self._request(**kwargs)
+        _record_usage(current_span(), operation, response, estimated_input_tokens)
+        return response
+
+    def _request(self, **kwargs) -> "ParsedResponse":
+        """Call the responses API within the time left for the current job."""
+        from openai import APITimeoutError
+
+        deadline = current_deadline()
+        if deadline is None:
+            return self.client.responses.parse(**kwargs)
+
+        deadline.check("OpenAI request")
+        try:
+            # Retries would each get the full remaining time again
+            return self.client.with_options(
+                timeout=deadline.remaining(), max_retries=0
+            ).responses.parse(**kwargs)
+        except APITimeoutError as e:
+            raise DeadlineExceeded("Deadline exceeded during OpenAI request") from e
+
+    def _get_citations(self, response: "ParsedResponse") -> list[Evidence]:
+        """Extract cited sources and the text they support from OpenAI response."""
+        citations = []
         for output in response.output:
             if output.type == "message":
                 for item in output.content:
                     if item.type == "output_text":
                         for annotation in item.annotations:
                             if annotation.type == "url_citation":
-                                sources.append(annotation.url)
-        return sources
+                                start = max(0, annotation.start_index - 300)
+                                citations.append(
+                                    Evidence(
+                                        url=annotation.url,
+                                        title=annotation.title or "",
+                                        snippet=item.text[start : annotation.end_index],
+                                    )
+                                )
+        return citations
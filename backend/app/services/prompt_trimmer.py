@@ -0,0 +1,106 @@
+"""Trimming of long inputs to an input token budget.
+
+Transcripts are cut into sentences (or word chunks when a transcript has no
+punctuation), each sentence is scored by how many checkable details it
+carries, and the densest regions are kept in their original order until the
+budget is used up.
+"""
+
+import re
+
+from app.core.config import DEFAULT_MODEL
+from app.core.tokens import count_tokens
+from app.services.statement_dedup import content_words
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_CAPITALIZED_RE = re.compile(r"(?<!^)(?<![.!?]\s)\b[A-ZÄÖÜ][\w-]+")
+
+# Longest segment in words; longer sentences are split into chunks
+MAX_SEGMENT_WORDS = 40
+# Placeholder for left-out text between kept segments
+GAP = "\n[...]\n"
+
+# Words that often signal a checkable claim
+_CLAIM_CUES = {
+    "percent", "million", "billion", "thousand", "study", "studies", "research",
+    "according", "proven", "cause", "causes", "increase", "increases",
+    "decrease", "decreases", "more", "less", "than", "always", "never",
+    "every", "most", "first", "largest", "highest", "lowest", "record",
+    "prozent", "millionen", "milliarden", "studie", "laut", "mehr", "weniger",
+    "immer", "nie", "erste", "größte", "höchste",
+}  # fmt: skip
+
+
+def _segments(text: str) -> list[str]:
+    """Split text into sentences of at most MAX_SEGMENT_WORDS words."""
+    segments = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SEGMENT_WORDS):
+            segments.append(" ".join(words[start : start + MAX_SEGMENT_WORDS]))
+    return [segment for segment in segments if segment]
+
+
+def claim_density(segment: str, tokens: int) -> float:
+    """Checkable details (numbers, names, claim words, distinct terms) per token."""
+    words = segment.lower().split()
+    details = (
+        2 * len(_NUMBER_RE.findall(segment))
+        + len(_CAPITALIZED_RE.findall(segment))
+        + sum(1 for word in words if word.strip(".,!?%") in _CLAIM_CUES)
+        + 0.25 * len(set(content_words(segment)))
+        + segment.count("%")
+    )
+    return details / max(tokens, 1)
+
+
+def _smooth(scores: list[float]) -> list[float]:
+    """Blend each score with its neighbours so dense regions stay together."""
+    smoothed = []
+    for i, score in enumerate(scores):
+        left = scores[i - 1] if i > 0 else score
+        right = scores[i + 1] if i + 1 < len(scores) else score
+        smoothed.append(0.25 * left + 0.5 * score + 0.25 * right)
+    return smoothed
+
+
+def _join(segments: list[str], kept: list[int]) -> str:
+    parts = []
+    for position, index in enumerate(kept):
+        if position and index != kept[position - 1] + 1:
+            parts.append(GAP)
+        elif position:
+            parts.append(" ")
+        parts.append(segments[index])
+    return "".join(parts)
+
+
+def trim_to_budget(text: str, budget: int, model: str = DEFAULT_MODEL) -> str:
+    """Shorten ``text`` to at most ``budget`` tokens, keeping claim-dense parts."""
+    if count_tokens(text, model) <= budget:
+        return text
+
+    segments = _segments(text)
+    tokens = [count_tokens(segment, model) for segment in segments]
+    scores = _smooth(
+        [claim_density(segment, n) for segment, n in zip(segments, tokens)]
+    )
+
+    # Take the densest segments first, skipping those that no longer fit
+    gap_tokens = count_tokens(GAP, model)
+    kept: list[int] = []
+    used = 0
+    for index in sorted(range(len(segments)), key=lambda i: scores[i], reverse=True):
+        cost = tokens[index] + gap_tokens
+        if used + cost <= budget:
+            kept.append(index)
+            used += cost
+    kept.sort()
+
+    # Token counts of joined text can differ slightly from the sum of parts
+    trimmed = _join(segments, kept)
+    while kept and count_tokens(trimmed, model) > budget:
+        kept.remove(min(kept, key=lambda i: scores[i]))
+        trimmed = _join(segments, kept)
+    return trimmed
@@ -0,0 +1,56 @@
+"""Immutable storage of finished fact-check results."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from app.core.config import RESULTS_DIR
+
+_RESULT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ResultStore:
+    """Store results as files addressed by the hash of their content.
+
+    Saving the same result twice yields the same id and never rewrites the
+    file, so a stored record can be served with a strong ETag forever.
+    """
+
+    def __init__(self, directory: str = RESULTS_DIR):
+        self.directory = Path(directory)
+
+    def save(self, data: str, results: list[dict[str, Any]], timed_out: bool) -> str:
+        """Store a finished job and return its result id."""
+        body = json.dumps(
+            {"data": data, "results": results, "timedOut": timed_out},
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=True,
+        ).encode("utf-8")
+        result_id = hashlib.sha256(body).hexdigest()[:32]
+
+        path = self._path(result_id)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see partial data
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+                f.write(body)
+            os.replace(f.name, path)
+
+        return result_id
+
+    def load(self, result_id: str) -> bytes | None:
+        """Return the stored JSON body of a result, or None if it is unknown."""
+        if not _RESULT_ID_RE.match(result_id):
+            return None
+        try:
+            return self._path(result_id).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _path(self, result_id: str) -> Path:
+        return self.directory / result_id[:2] / f"{result_id}.json"
@@ -0,0 +1,78 @@
+"""Grouping of near-duplicate statements so each claim is verified only once."""
+
+import re
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Function words, reporting phrases ("studies show", "according to") and
+# emphasis ("actually", "in fact") that do not change which claim is made
+_IGNORED_WORDS = {
+    # English
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "by",
+    "with", "from", "as", "that", "this", "these", "those", "it", "its", "is",
+    "are", "was", "were", "be", "been", "has", "have", "had", "do", "does",
+    "did", "than", "then", "which", "who", "whom", "there", "their", "they",
+    "according", "study", "studies", "research", "researchers", "scientists",
+    "experts", "report", "reports", "show", "shows", "shown", "suggest",
+    "suggests", "say", "says", "said", "claim", "claims", "found", "find",
+    "finds", "indicate", "indicates", "reportedly", "actually", "really",
+    "indeed", "fact", "also",
+    # German
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem",
+    "einer", "eines", "und", "oder", "von", "vom", "zu", "zum", "zur", "im",
+    "mit", "auf", "für", "ist", "sind", "war", "waren", "hat", "haben",
+    "dass", "laut", "studie", "studien", "zeigen", "zeigt", "forscher",
+    "über", "nach", "davon", "tatsächlich", "auch",
+}  # fmt: skip
+
+# Negations flip the meaning of a claim, so statements only merge if they agree
+_NEGATIONS = {"not", "no", "never", "none", "nicht", "kein", "keine", "nie"}
+
+
+def _words(statement: str) -> list[str]:
+    text = statement.lower().replace("n't", " not").replace("%", " percent")
+    return [word for word in _WORD_RE.findall(text) if not word.isdigit()]
+
+
+def _stem(word: str) -> str:
+    """Very light stemming so "causes" and "cause" compare equal."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def content_words(text: str) -> list[str]:
+    """Stemmed words of a text that carry its meaning, in order."""
+    ignored = _IGNORED_WORDS | _NEGATIONS
+    return [_stem(word) for word in _words(text) if word not in ignored]
+
+
+def _signature(statement: str) -> tuple[tuple[str, ...], frozenset[str], bool]:
+    """What two statements must share to be the same claim.
+
+    Every content word counts, in order: a single different word can swap an
+    entity ("born in Germany" vs "born in Austria") or flip the claim
+    ("increases" vs "decreases"), and a different order can swap roles.
+    """
+    content = tuple(content_words(statement))
+    negated = any(word in _NEGATIONS for word in _words(statement))
+    numbers = frozenset(n.replace(",", ".") for n in _NUMBER_RE.findall(statement))
+    return content, numbers, negated
+
+
+def group_statements(statements: list[str]) -> list[int]:
+    """Map each statement to the index of the statement verified on its behalf.
+
+    Statements that differ only in wording that does not change the claim
+    (case, punctuation, plurals, function words and framing such as "Studies
+    show X causes Y" vs "X causes Y") end up in the same group. The first
+    statement of a group is its representative.
+    """
+    representatives: dict[tuple, int] = {}
+    return [
+        representatives.setdefault(_signature(statement), i)
+        for i, statement in enumerate(statements)
+    ]
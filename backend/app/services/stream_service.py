@@ -0,0 +1,226 @@
+"""Fact checking of documents while they are still being uploaded.
+
+The upload is decoded incrementally and cut into windows at sentence
+boundaries. Statements are extracted from each window as soon as it is
+complete, and each new statement is verified right away, so results for the
+start of a document are ready before its end has arrived. Only the current
+window, a few pending windows and the statements found so far are held in
+memory.
+"""
+
+import asyncio
+import codecs
+import hashlib
+import logging
+import re
+from typing import Any, AsyncIterator
+
+from app.core.config import (
+    STREAM_MAX_PENDING_WINDOWS,
+    STREAM_MAX_STATEMENTS,
+    STREAM_VERIFY_CONCURRENCY,
+    STREAM_WINDOW_CHARS,
+)
+from app.core.deadline import Deadline
+from app.services.content_service import (
+    ContentService,
+    statement_result,
+    timed_out_result,
+)
+from app.services.statement_dedup import group_statements
+
+logger = logging.getLogger("stream_service")
+
+_SENTENCE_END_RE = re.compile(r"[.!?…]+[\"'”)\]]*\s+|\n+")
+
+
+class TextWindower:
+    """Cut a growing text into windows that end at sentence boundaries."""
+
+    def __init__(self, window_chars: int = STREAM_WINDOW_CHARS):
+        self.window_chars = window_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the windows that are now complete."""
+        self._buffer += text
+        windows = []
+        while len(self._buffer) >= self.window_chars:
+            cut = self._cut_point(self._buffer[: self.window_chars])
+            windows.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:]
+        return [window for window in windows if window]
+
+    def flush(self) -> list[str]:
+        """Return the rest of the text as a last window."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+    @staticmethod
+    def _cut_point(text: str) -> int:
+        # Prefer the last sentence end, then the last space, in the second half
+        sentence_end = None
+        for sentence_end in _SENTENCE_END_RE.finditer(text):
+            pass
+        if sentence_end is not None and sentence_end.end() > len(text) // 2:
+            return sentence_end.end()
+        space = text.rfind(" ")
+        return space + 1 if space > len(text) // 2 else len(text)
+
+
+class StreamingFactCheck:
+    """Extract and verify statements from a document as it arrives."""
+
+    def __init__(self, content_service: ContentService, deadline: Deadline):
+        self.content_service = content_service
+        self.deadline = deadline
+        self.statements: list[str] = []
+        self.results: dict[int, dict[str, Any]] = {}
+        self.timed_out = False
+        self.truncated = False
+        # Identifies the document without keeping it in memory
+        self.digest = hashlib.sha256()
+        self._events: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        self._verifications: set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(STREAM_VERIFY_CONCURRENCY)
+
+    async def events(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+        """Consume the upload and yield progress and results as they happen."""
+        pipeline = asyncio.create_task(self._run(chunks))
+        try:
+            while (event := await self._events.get()) is not None:
+                yield event
+        finally:
+            # Stops the work if the client goes away before the end
+            pipeline.cancel()
+
+    def ordered_results(self) -> list[dict[str, Any]]:
+        """Results in the order the statements appear in the document."""
+        return [self.results[index] for index in sorted(self.results)]
+
+    async def _run(self, chunks: AsyncIterator[bytes]):
+        # Bounded, so reading pauses while extraction is behind
+        windows: asyncio.Queue[str | None] = asyncio.Queue(
+            maxsize=STREAM_MAX_PENDING_WINDOWS
+        )
+        extractor = asyncio.create_task(self._extract_windows(windows))
+        try:
+            await self._read(chunks, windows)
+            await windows.put(None)
+            await extractor
+            if self._verifications:
+                await asyncio.wait(self._verifications)
+            await self._events.put(
+                {
+                    "type": "complete",
+                    "statements": len(self.statements),
+                    "timedOut": self.timed_out
+                    or any(result.get("timedOut") for result in self.results.values()),
+                    "truncated": self.truncated,
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error during streaming fact check: {str(e)}", exc_info=True)
+            await self._events.put({"type": "error", "message": str(e)})
+        finally:
+            extractor.cancel()
+            for task in self._verifications:
+                task.cancel()
+            await self._events.put(None)
+
+    async def _read(self, chunks: AsyncIterator[bytes], windows: asyncio.Queue):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        windower = TextWindower()
+        async for chunk in chunks:
+            self.digest.update(chunk)
+            for window in windower.feed(decoder.decode(chunk)):
+                await windows.put(window)
+            if self.deadline.expired:
+                self.timed_out = True
+                return
+        for window in windower.feed(decoder.decode(b"", final=True)):
+            await windows.put(window)
+        for window in windower.flush():
+            await windows.put(window)
+
+    async def _extract_windows(self, windows: asyncio.Queue):
+        index = 0
+        while (window := await windows.get()) is not None:
+            await self._extract(index, window)
+            index += 1
+
+    async def _extract(self, index: int, window: str):
+        """Extract statements from a window and start verifying the new ones."""
+        if self.deadline.expired:
+            self.timed_out = True
+            return
+        if len(self.statements) >= STREAM_MAX_STATEMENTS:
+            self.truncated = True
+            return
+
+        try:
+            statements = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self.content_service.openai_service.extract_statements, window
+                ),
+                self.deadline.remaining(),
+            )
+        except TimeoutError:
+            self.timed_out = True
+            return
+        except Exception as e:
+            # One failed window should not end the whole document
+            logger.error(f"Extraction failed for window {index}: {str(e)}")
+            await self._events.put(
+                {"type": "error", "window": index, "message": str(e)}
+            )
+            return
+
+        new = self._add_statements(statements)
+        await self._events.put(
+            {
+                "type": "window",
+                "index": index,
+                "statements": len(new),
+                "duplicates": len(statements) - len(new),
+            }
+        )
+        for statement_index in new:
+            task = asyncio.create_task(self._verify(statement_index))
+            self._verifications.add(task)
+
+    def _add_statements(self, statements: list[str]) -> list[int]:
+        """Keep statements that are not near-duplicates of earlier ones."""
+        seen = len(self.statements)
+        representatives = group_statements(self.statements + statements)
+        new = []
+        for offset, statement in enumerate(statements):
+            if representatives[seen + offset] != seen + offset:
+                continue
+            if len(self.statements) >= STREAM_MAX_STATEMENTS:
+                self.truncated = True
+                break
+            self.statements.append(statement)
+            new.append(len(self.statements) - 1)
+        return new
+
+    async def _verify(self, index: int):
+        statement = self.statements[index]
+        async with self._semaphore:
+            try:
+                statement_check, sources = await asyncio.wait_for(
+                    asyncio.to_thread(self.content_service.check_statement, statement),
+                    self.deadline.remaining(),
+                )
+                result = statement_result(statement, statement_check, sources)
+            except TimeoutError:
+                result = timed_out_result(statement)
+            except Exception as e:
+                logger.error(f"Verification failed for statement {index}: {str(e)}")
+                await self._events.put(
+                    {"type": "error", "index": index, "message": str(e)}
+                )
+                return
+
+        self.results[index] = result
+        await self._events.put({"type": "result", "index": index, **result})
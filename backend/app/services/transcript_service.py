@@ -0,0 +1,369 @@
+"""Service for fetching video transcripts from pluggable providers."""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Protocol
+
+from app.core.config import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RESET_TIMEOUT,
+    RAPID_API_KEY,
+    TRANSCRIPT_HEDGE_DELAY,
+    TRANSCRIPT_HEDGE_MIN_SAMPLES,
+    TRANSCRIPT_SAME_PROVIDER_HEDGES,
+    TRANSCRIPT_TIMEOUT,
+)
+from app.core.deadline import current_deadline, time_left
+from app.core.tracing import start_span
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger("transcript_service")
+
+
+class TranscriptError(Exception):
+    """Raised when a transcript could not be retrieved."""
+
+
+class TranscriptUnavailableError(TranscriptError):
+    """Raised when a video has no usable transcript, e.g. a private or silent one.
+
+    Asking again or asking another provider will not help, and the provider
+    itself is working, so this neither trips its circuit breaker nor is retried.
+    """
+
+
+class TranscriptProvider(Protocol):
+    """A source of video transcripts.
+
+    Anything with a unique ``name``, a request ``timeout`` in seconds and a
+    blocking ``fetch`` method can be registered, which makes it easy to plug in
+    local stub providers when testing.
+    """
+
+    name: str
+    timeout: float
+
+    def fetch(self, url: str) -> str: ...
+
+
+class RapidAPITranscriptProvider:
+    """Transcript provider backed by a RapidAPI transcription endpoint."""
+
+    def __init__(self, name: str, endpoint: str, host: str, timeout: float):
+        self.name = name
+        self.endpoint = endpoint
+        self.host = host
+        self.timeout = timeout
+        self._session: "requests.Session | None" = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """HTTP session that keeps connections to the provider open."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # Imported on first use to keep application startup fast
+                    import requests
+
+                    self._session = requests.Session()
+        return self._session
+
+    def warm_up(self, timeout: float):
+        """Resolve the provider host and open a connection to it."""
+        self.session.head(f"https://{self.host}/", timeout=timeout)
+
+    def fetch(self, url: str) -> str:
+        """Request the transcript of a video from RapidAPI."""
+        headers = {
+            "x-rapidapi-key": RAPID_API_KEY,
+            "x-rapidapi-host": self.host,
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+
+        response = self.session.post(
+            self.endpoint,
+            data={"url": url},
+            headers=headers,
+            timeout=time_left(self.timeout),
+        )
+        # Client errors other than timeouts and rate limits reject the video
+        if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+            raise TranscriptUnavailableError(
+                f"{self.name} rejected the video (HTTP {response.status_code})"
+            )
+        response.raise_for_status()
+
+        try:
+            transcript = response.json()["response"]["text"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise TranscriptError(f"Unexpected response from {self.name}") from e
+
+        if not isinstance(transcript, str) or not transcript.strip():
+            raise TranscriptUnavailableError(f"Empty transcript from {self.name}")
+
+        return transcript
+
+
+class CircuitBreaker:
+    """Stop calling a provider after repeated failures until it has cooled down.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single trial
+    call through (half-open) and closes again if that call succeeds.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state: closed, open or half-open."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def allow_request(self) -> bool:
+        """Check whether a call may be made and reserve the trial call if needed."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_cancelled(self):
+        """Release a trial call that ended without a verdict on the provider."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 100):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        """Return the p-th percentile (0-100) or None if there are no samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, round(p / 100 * (len(samples) - 1)))
+        return samples[index]
+
+
+class TranscriptService:
+    """Fetch transcripts with timeouts, circuit breakers, hedging and failover.
+
+    Providers are tried in the order they are registered for a platform. When
+    the current provider has not answered after its observed p95 latency, the
+    next provider is started as a hedge and whichever answers first wins. A
+    provider that fails hands over to the next one straight away. A platform
+    with a single provider is hedged with another request to that provider.
+    Only timeouts, connection errors and server errors count as failures; a
+    video without a usable transcript ends the request without retries.
+    """
+
+    def __init__(self, providers: dict[str, list[TranscriptProvider]]):
+        self.providers = providers
+        names = {provider.name for chain in providers.values() for provider in chain}
+        self._breakers = {
+            name: CircuitBreaker(
+                CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_RESET_TIMEOUT
+            )
+            for name in names
+        }
+        self._latencies = {name: LatencyTracker() for name in names}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, 2 * len(names)), thread_name_prefix="transcript"
+        )
+
+    def warm_up(self, timeout: float):
+        """Open connections to every provider that supports warming up."""
+        for chain in self.providers.values():
+            for provider in chain:
+                warm_up = getattr(provider, "warm_up", None)
+                if warm_up is None:
+                    continue
+                try:
+                    warm_up(timeout)
+                except Exception as e:
+                    logger.warning(f"Warming up {provider.name} failed: {str(e)}")
+
+    def get_transcript(self, platform: str, url: str) -> str:
+        """Get the transcript of a video on the given platform."""
+        with start_span(
+            "transcript.fetch", {"transcript.platform": platform, "url": url}
+        ) as span:
+            attempts: list[str] = []
+            try:
+                return self._get_transcript(platform, url, attempts)
+            finally:
+                span.set_attributes(
+                    {
+                        "transcript.attempts": len(attempts),
+                        "transcript.providers": attempts,
+                        "transcript.retries": max(0, len(attempts) - 1),
+                    }
+                )
+
+    def _get_transcript(self, platform: str, url: str, attempts: list[str]) -> str:
+        providers = self.providers.get(platform, [])
+        if not providers:
+            raise TranscriptError(f"No transcript provider configured for {platform}")
+        if len(providers) == 1:
+            # Without an alternate, a second request often beats a slow first one
+            providers = providers * (1 + TRANSCRIPT_SAME_PROVIDER_HEDGES)
+
+        remaining = iter(providers)
+        pending: dict[Future, TranscriptProvider] = {}
+        errors: list[str] = []
+        hedge_at = 0.0
+
+        def launch() -> bool:
+            """Start the next provider whose circuit breaker lets the call through."""
+            nonlocal hedge_at
+            for provider in remaining:
+                if not self._breakers[provider.name].allow_request():
+                    errors.append(f"{provider.name}: circuit open")
+                    continue
+                context = contextvars.copy_context()
+                future = self._executor.submit(context.run, self._fetch, provider, url)
+                pending[future] = provider
+                attempts.append(provider.name)
+                hedge_at = time.monotonic() + self.hedge_delay(provider)
+                return True
+            return False
+
+        has_more = launch()
+
+        deadline = current_deadline()
+
+        while pending:
+            timeout = max(0.0, hedge_at - time.monotonic()) if has_more else None
+            if deadline is not None:
+                deadline.check("transcript was received")
+                time_remaining = deadline.remaining()
+                timeout = (
+                    time_remaining if timeout is None else min(timeout, time_remaining)
+                )
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if deadline is not None and deadline.expired:
+                    continue
+                # The latest provider is slower than usual, hedge with the next one
+                has_more = launch()
+                if has_more:
+                    logger.info(f"Hedging transcript request for {url}")
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()
+                except TranscriptUnavailableError:
+                    raise
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+                    logger.warning(f"Transcript provider {provider.name} failed: {e}")
+
+            if not pending:
+                # Fail over to the next provider
+                has_more = launch()
+
+        raise TranscriptError("Failed to get transcript (" + "; ".join(errors) + ")")
+
+    def hedge_delay(self, provider: TranscriptProvider) -> float:
+        """Seconds to wait for a provider before hedging with the next one."""
+        latencies = self._latencies[provider.name]
+        p95 = latencies.percentile(95)
+        if p95 is None or len(latencies) < TRANSCRIPT_HEDGE_MIN_SAMPLES:
+            p95 = TRANSCRIPT_HEDGE_DELAY
+        return min(p95, provider.timeout)
+
+    def _fetch(self, provider: TranscriptProvider, url: str) -> str:
+        """Call a provider and record the outcome for its breaker and latency stats."""
+        started = time.monotonic()
+        try:
+            with start_span(
+                "transcript.provider", {"transcript.provider": provider.name}
+            ):
+                transcript = provider.fetch(url)
+        except TranscriptUnavailableError:
+            # The provider answered, the video just has no transcript
+            self._breakers[provider.name].record_success()
+            raise
+        except Exception:
+            deadline = current_deadline()
+            if deadline is not None and deadline.expired:
+                # Running out of job time is not the provider's fault
+                self._breakers[provider.name].record_cancelled()
+            else:
+                self._breakers[provider.name].record_failure()
+            raise
+        self._latencies[provider.name].record(time.monotonic() - started)
+        self._breakers[provider.name].record_success()
+        return transcript
+
+
+def default_providers() -> dict[str, list[TranscriptProvider]]:
+    """Transcript providers used in production, in order of preference."""
+    return {
+        "instagram": [
+            RapidAPITranscriptProvider(
+                name="rapidapi-instagram",
+                endpoint="https://instagram-video-transcript.p.rapidapi.com/transcribe-ig-video",
+                host="instagram-video-transcript.p.rapidapi.com",
+                timeout=TRANSCRIPT_TIMEOUT,
+            ),
+        ],
+        "tiktok": [
+            RapidAPITranscriptProvider(
+                name="rapidapi-tiktok",
+                endpoint="https://tiktok-transcript.p.rapidapi.com/transcribe-tiktok-audio",
+                host="tiktok-transcript.p.rapidapi.com",
+                timeout=TRANSCRIPT_TIMEOUT,
+            ),
+        ],
+    }
@@ -0,0 +1,134 @@
+"""In-memory cache of statement verdicts with popularity tracking."""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import (
+    REFRESH_MAX_TTL_SHARE,
+    VERDICT_CACHE_MAX_ENTRIES,
+    VERDICT_CACHE_POPULARITY_HALF_LIFE,
+    VERDICT_CACHE_TTL,
+    VERDICT_CACHE_VOLATILE_TTL,
+)
+from app.models.schemas import StatementCheck
+
+# Claims about the present go stale quickly and get a shorter TTL
+_VOLATILE_RE = re.compile(
+    r"\b(current(ly)?|now|today|latest|recent(ly)?|this (week|month|year)|"
+    r"aktuell(e|en|er)?|derzeit(ig)?|heute|jetzt|momentan|dieses jahr)\b",
+    re.IGNORECASE,
+)
+
+
+def is_volatile(statement: str) -> bool:
+    """Whether a statement is about the present and its verdict may change soon."""
+    return _VOLATILE_RE.search(statement) is not None
+
+
+def normalize_statement(statement: str) -> str:
+    """Cache key for a statement (case, whitespace and end punctuation ignored)."""
+    return " ".join(statement.lower().split()).rstrip(".!?")
+
+
+@dataclass
+class CachedVerdict:
+    """A cached verdict and how often it has been requested."""
+
+    statement: str
+    statement_check: StatementCheck
+    sources: list[str]
+    expires_at: float
+    ttl: float
+    popularity: float = 0.0
+    last_hit: float = 0.0
+    refreshing: bool = False
+
+    def due_for_refresh(self, now: float, window: float) -> bool:
+        """Whether the entry expires within ``window`` seconds, capped by its TTL.
+
+        Without the cap, a short-lived entry refreshed during a wide window
+        would be due again straight away.
+        """
+        window = min(window, self.ttl * REFRESH_MAX_TTL_SHARE)
+        return now < self.expires_at <= now + window
+
+    def decayed_popularity(self, now: float) -> float:
+        """Hit count with exponential decay, so trending claims rank highest."""
+        elapsed = max(0.0, now - self.last_hit)
+        return self.popularity * 0.5 ** (elapsed / VERDICT_CACHE_POPULARITY_HALF_LIFE)
+
+
+class VerdictCache:
+    """Thread-safe LRU cache of verdicts keyed by normalized statement."""
+
+    def __init__(self, max_entries: int = VERDICT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedVerdict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, statement: str) -> tuple[StatementCheck, list[str]] | None:
+        """Return a fresh cached verdict and count the hit."""
+        key = normalize_statement(statement)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                return None
+            entry.popularity = entry.decayed_popularity(now) + 1
+            entry.last_hit = now
+            self._entries.move_to_end(key)
+            return entry.statement_check, list(entry.sources)
+
+    def set(self, statement: str, statement_check: StatementCheck, sources: list[str]):
+        """Store a verdict, keeping the popularity of an entry being replaced."""
+        key = normalize_statement(statement)
+        now = time.time()
+        ttl = (
+            VERDICT_CACHE_VOLATILE_TTL if is_volatile(statement) else VERDICT_CACHE_TTL
+        )
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = CachedVerdict(
+                statement=statement,
+                statement_check=statement_check,
+                sources=list(sources),
+                expires_at=now + ttl,
+                ttl=ttl,
+                popularity=previous.popularity if previous else 0.0,
+                last_hit=previous.last_hit if previous else now,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh_candidates(
+        self, window: float, min_popularity: float, limit: int
+    ) -> list[CachedVerdict]:
+        """Popular entries expiring within ``window`` seconds, hottest first.
+
+        Returned entries are marked as refreshing so that concurrent callers do
+        not pick them up twice; ``finish_refresh`` clears the mark.
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [
+                entry
+                for entry in self._entries.values()
+                if not entry.refreshing
+                and entry.due_for_refresh(now, window)
+                and entry.decayed_popularity(now) >= min_popularity
+            ]
+            candidates.sort(
+                key=lambda entry: entry.decayed_popularity(now), reverse=True
+            )
+            candidates = candidates[:limit]
+            for entry in candidates:
+                entry.refreshing = True
+        return candidates
+
+    def finish_refresh(self, entry: CachedVerdict):
+        with self._lock:
+            entry.refreshing = False
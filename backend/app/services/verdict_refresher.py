@@ -0,0 +1,87 @@
+"""Background re-verification of popular cached verdicts before they expire."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+
+from app.core.config import (
+    REFRESH_AHEAD_WINDOW,
+    REFRESH_INTERVAL,
+    REFRESH_MAX_PER_HOUR,
+    REFRESH_MIN_POPULARITY,
+    REFRESH_OFF_PEAK_HOURS,
+    REFRESH_OFF_PEAK_WINDOW,
+)
+from app.core.tracing import start_span
+from app.services.content_service import ContentService
+
+logger = logging.getLogger("verdict_refresher")
+
+
+class VerdictRefresher:
+    """Re-run ``check_statement`` for hot cache entries shortly before expiry.
+
+    Spend is capped at ``REFRESH_MAX_PER_HOUR`` upstream checks. During the
+    off-peak hours the refresh-ahead window widens, so entries that would
+    expire during the next peak are refreshed while traffic is low.
+    """
+
+    def __init__(self, content_service: ContentService):
+        self.content_service = content_service
+        self.cache = content_service.verdict_cache
+        self._spent: deque[float] = deque()
+
+    def remaining_budget(self) -> int:
+        """Upstream checks still allowed in the current hour."""
+        now = time.time()
+        while self._spent and now - self._spent[0] > 3600:
+            self._spent.popleft()
+        return max(0, REFRESH_MAX_PER_HOUR - len(self._spent))
+
+    def refresh_window(self) -> float:
+        """How far ahead of expiry entries are refreshed right now."""
+        if datetime.now().hour in REFRESH_OFF_PEAK_HOURS:
+            return REFRESH_OFF_PEAK_WINDOW
+        return REFRESH_AHEAD_WINDOW
+
+    async def refresh_once(self) -> int:
+        """Refresh due entries within budget and return how many were refreshed."""
+        budget = self.remaining_budget()
+        if budget == 0:
+            return 0
+
+        candidates = self.cache.refresh_candidates(
+            self.refresh_window(), REFRESH_MIN_POPULARITY, budget
+        )
+        refreshed = 0
+        for entry in candidates:
+            try:
+                self._spent.append(time.time())
+                with start_span("refresh.verdict"):
+                    # Always search the web, the point is to get fresh evidence
+                    statement_check, sources = await asyncio.to_thread(
+                        self.content_service.verify_statement,
+                        entry.statement,
+                        use_evidence_store=False,
+                    )
+                self.cache.set(entry.statement, statement_check, sources)
+                refreshed += 1
+            except Exception as e:
+                logger.warning(f"Failed to refresh verdict: {str(e)}")
+            finally:
+                self.cache.finish_refresh(entry)
+        return refreshed
+
+    async def run(self):
+        """Refresh hot entries until cancelled."""
+        while True:
+            try:
+                refreshed = await self.refresh_once()
+                if refreshed:
+                    logger.info(f"Refreshed {refreshed} cached verdicts")
+            except Exception as e:
+                logger.error(f"Error in verdict refresher: {str(e)}", exc_info=True)
+
+            await asyncio.sleep(REFRESH_INTERVAL)
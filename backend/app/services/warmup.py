@@ -0,0 +1,35 @@
+"""Warm up upstream connections before the first request is served."""
+
+import asyncio
+import logging
+import time
+
+from app.core.config import WARMUP_TIMEOUT
+from app.services.content_service import ContentService
+
+logger = logging.getLogger("warmup")
+
+
+async def warm_up(content_service: ContentService, timeout: float = WARMUP_TIMEOUT):
+    """Import clients and open connections to OpenAI and the transcript providers.
+
+    Gives up after ``timeout`` seconds so a slow upstream never blocks startup
+    for long; anything not warmed by then is set up on first use as usual.
+    """
+    start = time.perf_counter()
+    steps = {
+        "openai": asyncio.create_task(
+            asyncio.to_thread(content_service.openai_service.warm_up, timeout)
+        ),
+        "transcripts": asyncio.create_task(
+            asyncio.to_thread(content_service.transcript_service.warm_up, timeout)
+        ),
+    }
+    await asyncio.wait(steps.values(), timeout=timeout)
+
+    for name, task in steps.items():
+        if not task.done():
+            logger.warning(f"Warming up {name} did not finish in {timeout}s")
+        elif task.exception() is not None:
+            logger.warning(f"Warming up {name} failed: {str(task.exception())}")
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
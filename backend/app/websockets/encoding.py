@@ -0,0 +1,135 @@
+"""Compact encodings of WebSocket messages, negotiated per connection.
+
+Clients choose them with query parameters on the WebSocket URL:
+
+- ``encoding=msgpack`` sends binary MessagePack frames instead of JSON text
+  (needs the optional ``msgpack`` package, otherwise JSON is used)
+- ``delta=1`` sends each statement and source once per connection and refers
+  to it by number afterwards
+
+Per-message deflate is negotiated by the WebSocket handshake itself.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Literal
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("factcheck_websocket")
+
+Encoding = Literal["json", "msgpack"]
+
+
+def _load_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+class MessageEncoder:
+    """Encode the messages sent over one connection.
+
+    In delta mode, statement and source texts are replaced by numbers that
+    stay valid for the lifetime of the connection. A message that uses a
+    number for the first time defines it in ``defs``:
+
+        {"defs": {"statements": {"0": "text"}, "sources": {"0": "url"}}, ...}
+
+    Results in a complete message whose verdict equals an earlier result of
+    the same message carry ``sameAs`` with that result's position instead.
+    """
+
+    def __init__(self, encoding: str = "json", delta: bool = False):
+        self.msgpack = _load_msgpack() if encoding == "msgpack" else None
+        if encoding == "msgpack" and self.msgpack is None:
+            logger.warning("msgpack is not installed, falling back to JSON")
+        self.encoding: Encoding = "msgpack" if self.msgpack else "json"
+        self.delta = delta
+        self._statements: Dict[str, int] = {}
+        self._sources: Dict[str, int] = {}
+
+    @classmethod
+    def from_websocket(cls, websocket: WebSocket) -> "MessageEncoder":
+        """Create the encoder requested in the connection's query parameters."""
+        params = websocket.query_params
+        return cls(
+            encoding=params.get("encoding", "json"),
+            delta=params.get("delta", "").lower() in ("1", "true", "yes"),
+        )
+
+    async def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Send a message in the negotiated encoding."""
+        if self.delta:
+            message = self.compact(message)
+        if self.msgpack is not None:
+            await websocket.send_bytes(self.msgpack.packb(message))
+        else:
+            await websocket.send_text(
+                json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+            )
+
+    def compact(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace repeated texts in a message by their numbers."""
+        defs: Dict[str, Dict[str, str]] = {}
+        message = dict(message)
+
+        if "currentStatement" in message:
+            message["currentStatement"] = self._ref(
+                self._statements, "statements", message["currentStatement"], defs
+            )
+        if "statements" in message:
+            message["statements"] = [
+                self._ref(self._statements, "statements", statement, defs)
+                for statement in message["statements"]
+            ]
+        if "results" in message:
+            message["results"] = self._compact_results(message["results"], defs)
+
+        if defs:
+            message["defs"] = defs
+        return message
+
+    def _compact_results(
+        self, results: list[Dict[str, Any]], defs: Dict[str, Dict[str, str]]
+    ) -> list[Dict[str, Any]]:
+        compacted = []
+        seen: Dict[str, int] = {}
+        for position, result in enumerate(results):
+            result = dict(result)
+            if "statement" in result:
+                result["statement"] = self._ref(
+                    self._statements, "statements", result["statement"], defs
+                )
+
+            # Near-duplicate statements share a verdict, so send it once
+            verdict = {k: v for k, v in result.items() if k != "statement"}
+            key = json.dumps(verdict, sort_keys=True)
+            if key in seen:
+                compacted.append(
+                    {"statement": result["statement"], "sameAs": seen[key]}
+                )
+                continue
+            seen[key] = position
+
+            if "sources" in result:
+                result["sources"] = [
+                    self._ref(self._sources, "sources", source, defs)
+                    for source in result["sources"]
+                ]
+            compacted.append(result)
+        return compacted
+
+    def _ref(
+        self,
+        table: Dict[str, int],
+        kind: str,
+        text: str,
+        defs: Dict[str, Dict[str, str]],
+    ) -> int:
+        if text not in table:
+            table[text] = len(table)
+            defs.setdefault(kind, {})[str(table[text])] = text
+        return table[text]
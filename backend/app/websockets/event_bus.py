@@ -0,0 +1,187 @@
+"""Routing of WebSocket messages between workers.
+
+Each worker only holds the sockets of its own clients. A job keeps sending
+to its client id, so when that client is connected to another worker (after
+reconnecting, or with several uvicorn workers or nodes behind a load
+balancer) the message goes through the event bus to the worker that owns
+the socket.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.config import EVENT_BUS_BACKEND, EVENT_BUS_DIR, EVENT_BUS_POLL_INTERVAL
+
+logger = logging.getLogger("factcheck_event_bus")
+
+# Sends a message to a client connected to this worker (False if it is not)
+Deliver = Callable[[str, Dict[str, Any]], Awaitable[bool]]
+
+
+class EventBus:
+    """Registry of which worker holds each client, and delivery to it.
+
+    The default implementation is for a single process, where every client
+    is local and there is nothing to route.
+    """
+
+    worker_id = "local"
+
+    async def start(self, deliver: Deliver):
+        """Start receiving messages addressed to clients of this worker."""
+
+    async def stop(self):
+        """Stop receiving messages and forget the clients of this worker."""
+
+    async def register(self, client_id: str):
+        """Record that the client is connected to this worker."""
+
+    async def unregister(self, client_id: str):
+        """Record that the client is no longer connected to this worker."""
+
+    async def publish(self, client_id: str, message: Dict[str, Any]) -> bool:
+        """Send a message to a client of another worker (False if there is none)."""
+        return False
+
+
+class FileEventBus(EventBus):
+    """Event bus that shares the registry and mailboxes through a directory.
+
+    Works for several workers on one machine, or several nodes with a shared
+    volume. Messages are files in the inbox of the owning worker, named so
+    that listing them in order keeps the order they were published in.
+    """
+
+    def __init__(
+        self,
+        directory: str = EVENT_BUS_DIR,
+        poll_interval: float = EVENT_BUS_POLL_INTERVAL,
+    ):
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._clients: set[str] = set()
+        self._sequence = itertools.count()
+        self._poll_task: asyncio.Task | None = None
+
+    @property
+    def _inbox(self) -> Path:
+        return self.directory / "inbox" / self.worker_id
+
+    def _connection_path(self, client_id: str) -> Path:
+        # Client ids come from the URL, so never use them as file names
+        digest = hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:32]
+        return self.directory / "connections" / digest
+
+    async def start(self, deliver: Deliver):
+        self._inbox.mkdir(parents=True, exist_ok=True)
+        (self.directory / "connections").mkdir(parents=True, exist_ok=True)
+        self._poll_task = asyncio.create_task(self._poll(deliver))
+        logger.info(f"Event bus worker {self.worker_id} started in {self.directory}")
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+        for client_id in list(self._clients):
+            await self.unregister(client_id)
+        await asyncio.to_thread(self._remove_inbox)
+
+    async def register(self, client_id: str):
+        self._clients.add(client_id)
+        await asyncio.to_thread(
+            _write_atomic, self._connection_path(client_id), self.worker_id.encode()
+        )
+
+    async def unregister(self, client_id: str):
+        self._clients.discard(client_id)
+        await asyncio.to_thread(self._unregister, client_id)
+
+    def _unregister(self, client_id: str):
+        path = self._connection_path(client_id)
+        # The client may already have reconnected to another worker
+        if self._owner(path) == self.worker_id:
+            path.unlink(missing_ok=True)
+
+    async def publish(self, client_id: str, message: Dict[str, Any]) -> bool:
+        return await asyncio.to_thread(self._publish, client_id, message)
+
+    def _publish(self, client_id: str, message: Dict[str, Any]) -> bool:
+        owner = self._owner(self._connection_path(client_id))
+        if owner is None or owner == self.worker_id:
+            return False
+
+        inbox = self.directory / "inbox" / owner
+        if not inbox.is_dir():
+            logger.warning(f"Worker {owner} of client {client_id} is gone")
+            return False
+
+        name = f"{time.time_ns():020d}-{next(self._sequence):08d}-{self.worker_id}.json"
+        body = json.dumps({"clientId": client_id, "message": message})
+        _write_atomic(inbox / name, body.encode("utf-8"))
+        return True
+
+    def _remove_inbox(self):
+        for path in self._inbox.glob("*"):
+            path.unlink(missing_ok=True)
+        try:
+            self._inbox.rmdir()
+        except OSError:
+            pass
+
+    def _owner(self, path: Path) -> str | None:
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    async def _poll(self, deliver: Deliver):
+        """Deliver messages from the inbox of this worker as they arrive."""
+        while True:
+            try:
+                for client_id, message in await asyncio.to_thread(self._receive):
+                    if not await deliver(client_id, message):
+                        logger.debug(f"Dropping message for departed {client_id}")
+            except Exception as e:
+                logger.error(f"Error in event bus poller: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+    def _receive(self) -> list[tuple[str, Dict[str, Any]]]:
+        events = []
+        for path in sorted(self._inbox.glob("*.json")):
+            try:
+                event = json.loads(path.read_bytes())
+                events.append((event["clientId"], event["message"]))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Skip only this file, the rest of the batch is already read
+                logger.warning(f"Dropping unreadable message {path.name}: {str(e)}")
+            finally:
+                path.unlink(missing_ok=True)
+        return events
+
+
+def _write_atomic(path: Path, body: bytes):
+    """Write a file so that readers never see partial content."""
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=".", suffix=".tmp", delete=False
+    ) as f:
+        f.write(body)
+    os.replace(f.name, path)
+
+
+def create_event_bus(backend: str = EVENT_BUS_BACKEND) -> EventBus:
+    """Create the event bus selected by configuration."""
+    if backend == "file":
+        return FileEventBus()
+    if backend != "memory":
+        logger.warning(f"Unknown event bus backend '{backend}', using memory")
+    return EventBus()
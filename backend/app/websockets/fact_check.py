@@ -4,14 +4,38 @@ import asyncio
 import logging
 import uuid
 import time
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Callable, Dict, Literal, Optional
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 
-from app.api.dependencies import get_content_service
-from app.core.config import MAX_STATEMENTS
+from app.api.dependencies import (
+    get_checkpoint_store,
+    get_content_service,
+    get_event_bus,
+    get_result_store,
+)
+from app.core.config import (
+    DRAIN_TIMEOUT,
+    EXTRACTION_BUDGET_SHARE,
+    MAX_STATEMENTS,
+    RECONNECT_DELAY,
+    TRANSCRIPT_BUDGET_SHARE,
+)
+from app.core.deadline import Deadline, deadline_scope
+from app.core.lifecycle import is_draining, start_draining
+from app.core.profiling import profiler, stage_timings
+from app.core.tracing import current_span, start_span
+from app.core.usage import usage_tracker
 from app.models.schemas import BodyData
-from app.services.content_service import ContentService
+from app.services.content_service import (
+    ContentService,
+    statement_result,
+    timed_out_result,
+)
+from app.services.result_store import ResultStore
+from app.services.statement_dedup import group_statements
+from app.websockets.encoding import MessageEncoder
+from app.websockets.jobs import Job
 
 # Configure logging
 logging.basicConfig(
@@ -21,10 +45,14 @@ logger = logging.getLogger("factcheck_websocket")
 
 router = APIRouter(tags=["websockets"])
 
-# Store active connections
+# Store connections to clients of this worker
 active_connections: Dict[str, WebSocket] = {}
 # Store last activity time for each connection
 connection_last_activity: Dict[str, float] = {}
+# Store the negotiated message encoding for each connection
+connection_encoders: Dict[str, MessageEncoder] = {}
+# Store in-flight jobs by job id
+active_jobs: Dict[str, Job] = {}
 # Connection timeout in seconds (10 minutes)
 CONNECTION_TIMEOUT = 10 * 60
 # How often to check for inactive connections (5 minutes)
@@ -46,12 +74,16 @@ class ProgressUpdate(Dict[str, Any]):
         statementIndex: Optional[int] = None,
         totalStatements: Optional[int] = None,
         currentStatement: Optional[str] = None,
+        jobId: Optional[str] = None,
     ):
         data = {
             "type": "progress",
             "stage": stage,
         }
 
+        if jobId is not None:
+            data["jobId"] = jobId
+
         if statements is not None:
             data["statements"] = statements
 
@@ -73,16 +105,45 @@ class ErrorMessage(Dict[str, Any]):
 
 
 class CompleteMessage(Dict[str, Any]):
-    def __init__(self, results: list[Dict[str, Any]]):
-        super().__init__({"type": "complete", "results": results})
+    def __init__(
+        self,
+        results: list[Dict[str, Any]],
+        timedOut: bool = False,
+        resultId: Optional[str] = None,
+    ):
+        data = {"type": "complete", "results": results, "timedOut": timedOut}
+
+        if resultId is not None:
+            data["resultId"] = resultId
+
+        super().__init__(data)
+
+
+class ReconnectMessage(Dict[str, Any]):
+    """Ask the client to reconnect because this instance is shutting down."""
+
+    def __init__(self, retryAfter: float, jobIds: Optional[list[str]] = None):
+        data = {
+            "type": "reconnect",
+            "message": "Server is restarting, please reconnect",
+            "retryAfter": retryAfter,
+        }
+
+        # Unfinished jobs can be resumed by sending {"resume": job_id}
+        if jobIds:
+            data["jobIds"] = jobIds
+
+        super().__init__(data)
 
 
 class ConnectionMessage(Dict[str, Any]):
-    def __init__(self, client_id: str):
+    def __init__(self, client_id: str, encoding: str = "json", delta: bool = False):
         super().__init__(
             {
                 "type": "connection",
                 "client_id": client_id,
+                "encoding": encoding,
+                "delta": delta,
             }
         )
 
@@ -92,6 +153,7 @@ async def websocket_fact_check(
     websocket: WebSocket,
     client_id: str,
     content_service: ContentService = Depends(get_content_service),
+    result_store: ResultStore = Depends(get_result_store),
 ):
     """
     WebSocket endpoint for fact checking with real-time progress updates.
@@ -100,6 +162,10 @@ async def websocket_fact_check(
 
     - **client_id**: A unique identifier for the client connection. If not provided or "undefined", a UUID will be generated.
 
+    Query parameters `encoding=msgpack` (binary MessagePack frames) and
+    `delta=1` (statements and sources sent once, then referenced by number)
+    select a more compact encoding of the server messages.
+
     The client should send a JSON message with the following structure:
     ```json
     {
@@ -117,6 +183,8 @@ async def websocket_fact_check(
         - **verification**: Verifying statements
     - **error**: Error messages
     - **complete**: Final results of the fact checking process
+    - **reconnect**: The server is restarting; reconnect after `retryAfter`
+      seconds and resume unfinished jobs with `{"resume": job_id}`
 
     Connections will automatically close after 10 minutes of inactivity.
     """
@@ -128,8 +196,16 @@ async def websocket_fact_check(
     # Accept connection
     await websocket.accept()
     active_connections[client_id] = websocket
+    encoder = MessageEncoder.from_websocket(websocket)
+    connection_encoders[client_id] = encoder
     # Set initial activity time
     connection_last_activity[client_id] = time.time()
+    # Route messages for this client from other workers here
+    await get_event_bus().register(client_id)
+
+    if is_draining():
+        await close_for_restart(client_id)
+        return
 
     # Start the cleanup task if it's not already running
     if not hasattr(websocket_fact_check, "cleanup_task_running"):
@@ -138,7 +214,12 @@ async def websocket_fact_check(
 
     try:
         # Send initial connection confirmation
-        await send_message(client_id, ConnectionMessage(client_id=client_id))
+        await send_message(
+            client_id,
+            ConnectionMessage(
+                client_id=client_id, encoding=encoder.encoding, delta=encoder.delta
+            ),
+        )
 
         while True:
             # Wait for messages from the client
@@ -149,11 +230,23 @@ async def websocket_fact_check(
             logger.info(f"Received message from client {client_id}")
             logger.debug(f"Message data: {data}")
 
+            if is_draining():
+                if any(job.client_id == client_id for job in active_jobs.values()):
+                    # drain() hands this client its job ids once they are saved
+                    await send_message(
+                        client_id, ErrorMessage("Server is restarting, try again")
+                    )
+                    continue
+                await close_for_restart(client_id)
+                return
+
             # Start processing in the background
-            asyncio.create_task(process_request(client_id, data, content_service))
+            asyncio.create_task(
+                process_request(client_id, data, content_service, result_store)
+            )
 
     except WebSocketDisconnect:
-        disconnect(client_id)
+        await disconnect(client_id)
     except Exception as e:
         # Handle unexpected errors
         logger.error(
@@ -167,25 +260,83 @@ async def websocket_fact_check(
             logger.error(f"Failed to send error message to {client_id}", exc_info=True)
             pass
         finally:
-            disconnect(client_id)
+            await disconnect(client_id)
 
 
 async def send_message(client_id: str, data: Dict[str, Any]):
-    """Send message to client."""
+    """Send message to client, wherever it is connected."""
 
     logger.debug(f"Sending message to {client_id}: {data}")
-    if client_id in active_connections:
-        await active_connections[client_id].send_json(data)
-        # Update last activity time when sending messages
-        connection_last_activity[client_id] = time.time()
+    if not await deliver_message(client_id, data):
+        # The client may have reconnected to another worker
+        await get_event_bus().publish(client_id, data)
+
+
+async def deliver_message(client_id: str, data: Dict[str, Any]) -> bool:
+    """Send message to a client connected to this worker."""
+    if client_id not in active_connections:
+        return False
+    await connection_encoders[client_id].send(active_connections[client_id], data)
+    # Update last activity time when sending messages
+    connection_last_activity[client_id] = time.time()
+    return True
 
 
-def disconnect(client_id: str):
+async def disconnect(client_id: str):
     """Disconnect client."""
-    if client_id in active_connections:
-        del active_connections[client_id]
+    registered = active_connections.pop(client_id, None) is not None
     if client_id in connection_last_activity:
         del connection_last_activity[client_id]
+    connection_encoders.pop(client_id, None)
+    if registered:
+        await get_event_bus().unregister(client_id)
+
+
+async def close_for_restart(client_id: str, job_ids: Optional[list[str]] = None):
+    """Send a reconnect hint and close the connection for a server restart."""
+    try:
+        await send_message(client_id, ReconnectMessage(RECONNECT_DELAY, job_ids))
+        if client_id in active_connections:
+            await active_connections[client_id].close(
+                code=1012, reason="Server restarting"
+            )
+    except Exception as e:
+        logger.warning(f"Error closing connection for {client_id}: {str(e)}")
+    finally:
+        await disconnect(client_id)
+
+
+async def drain(timeout: float = DRAIN_TIMEOUT):
+    """Stop accepting jobs, let in-flight jobs finish and hand off the rest.
+
+    Jobs that are still running after ``timeout`` seconds are checkpointed and
+    cancelled; their clients get the job ids to resume on another instance.
+    """
+    start_draining()
+    logger.info(f"Draining {len(active_jobs)} in-flight jobs")
+
+    # Idle clients can move to another instance right away
+    busy_clients = {job.client_id for job in active_jobs.values()}
+    for client_id in list(active_connections):
+        if client_id not in busy_clients:
+            await close_for_restart(client_id)
+
+    tasks = [job.task for job in active_jobs.values() if job.task is not None]
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
+
+    # Checkpoint jobs that did not finish in time
+    unfinished: Dict[str, list[str]] = {}
+    checkpoint_store = get_checkpoint_store()
+    for job in list(active_jobs.values()):
+        if job.task is not None:
+            job.task.cancel()
+        await asyncio.to_thread(checkpoint_store.save, job.job_id, job.to_checkpoint())
+        unfinished.setdefault(job.client_id, []).append(job.job_id)
+        logger.info(f"Checkpointed job {job.job_id} of client {job.client_id}")
+
+    for client_id in list(active_connections):
+        await close_for_restart(client_id, unfinished.get(client_id))
 
 
 async def cleanup_inactive_connections():
@@ -220,7 +371,7 @@ async def cleanup_inactive_connections():
                             f"Error closing connection for {client_id}: {str(e)}"
                         )
                     finally:
-                        disconnect(client_id)
+                        await disconnect(client_id)
 
         except Exception as e:
             logger.error(f"Error in cleanup task: {str(e)}", exc_info=True)
@@ -230,89 +381,204 @@ async def cleanup_inactive_connections():
 
 
 async def process_request(
-    client_id: str, data: Dict[str, Any], content_service: ContentService
+    client_id: str,
+    data: Dict[str, Any],
+    content_service: ContentService,
+    result_store: ResultStore,
 ):
     """Process a fact-checking request with progress updates via WebSocket."""
-    try:
-        # Extract data from the request
-        if not data.get("data"):
-            await send_message(client_id, ErrorMessage("No data provided"))
-            return
-
-        # Create a BodyData object
-        body_data = BodyData(data=data.get("data"))
-
-        # Send initial progress - started
-        await send_message(client_id, ProgressUpdate(stage="started"))
+    with start_span("ws.fact_check", {"client_id": client_id}):
+        job = None
+        try:
+            if data.get("resume"):
+                # Continue a job checkpointed by an instance that shut down
+                checkpoint = await asyncio.to_thread(
+                    get_checkpoint_store().claim, str(data["resume"])
+                )
+                if checkpoint is None:
+                    await send_message(
+                        client_id, ErrorMessage("Job to resume was not found")
+                    )
+                    return
+                job = Job.from_checkpoint(checkpoint, client_id)
+                logger.info(f"Resuming job {job.job_id} for {client_id}")
 
-        # Initial URL parsing for progress reporting
-        from urllib.parse import urlparse
+            else:
+                # Extract data from the request
+                if not data.get("data"):
+                    await send_message(client_id, ErrorMessage("No data provided"))
+                    return
+
+                # Create a BodyData object
+                body_data = BodyData(data=data.get("data"), timeout=data.get("timeout"))
+                job = Job(client_id, str(body_data.data), body_data.timeout)
+
+            job.task = asyncio.current_task()
+            active_jobs[job.job_id] = job
+            body_data = BodyData(data=job.data, timeout=job.timeout)
+
+            deadline = Deadline.from_request(body_data.timeout)
+            with deadline_scope(deadline), usage_tracker.job(job.job_id, client_id):
+                await _process_request(
+                    job, body_data, content_service, result_store, deadline
+                )
 
-        parsed_url = urlparse(str(body_data.data))
+        except TimeoutError:
+            # The budget ran out before any statements were found
+            logger.warning(f"Fact check for {client_id} ran out of time")
+            await send_message(client_id, CompleteMessage(results=[], timedOut=True))
+        except Exception as e:
+            logger.error(
+                f"Error during fact checking for {client_id}: {str(e)}", exc_info=True
+            )
+            await send_message(
+                client_id, ErrorMessage(f"Error during fact checking: {str(e)}")
+            )
+        finally:
+            if job is not None:
+                active_jobs.pop(job.job_id, None)
+                profiler.job_finished()
+
+
+async def run_stage(
+    stage: str, timeout: float, func: Callable[..., Any], *args: Any
+) -> Any:
+    """Run a blocking pipeline stage in a thread, giving up after ``timeout``."""
+    if stage_timings.enabled:
+        return await asyncio.wait_for(
+            stage_timings.measure(stage, func, *args), timeout
+        )
+    return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout)
 
-        # Determine if we're processing a URL or text
-        if parsed_url.netloc:
-            # Handle URL
-            if content_service._is_instagram_url(
-                body_data.data
-            ) or content_service._is_tiktok_url(body_data.data):
-                # Notify about video processing
-                await send_message(client_id, ProgressUpdate(stage="video-processing"))
 
-                # Get transcript based on URL type
-                if content_service._is_instagram_url(body_data.data):
-                    transcript = content_service._get_instagram_transcript(
-                        body_data.data
-                    )
-                else:
-                    transcript = content_service._get_tiktok_transcript(body_data.data)
+async def _extract_statements(
+    client_id: str,
+    body_data: BodyData,
+    content_service: ContentService,
+    deadline: Deadline,
+) -> Optional[list[str]]:
+    """Get statements from text or a video transcript (None if input is invalid)."""
+    span = current_span()
+
+    # Initial URL parsing for progress reporting
+    from urllib.parse import urlparse
+
+    parsed_url = urlparse(str(body_data.data))
+    span.set_attribute("input.type", "url" if parsed_url.netloc else "text")
+
+    # Determine if we're processing a URL or text
+    if parsed_url.netloc:
+        # Handle URL
+        if content_service._is_instagram_url(
+            body_data.data
+        ) or content_service._is_tiktok_url(body_data.data):
+            # Notify about video processing
+            await send_message(client_id, ProgressUpdate(stage="video-processing"))
+
+            # Get transcript based on URL type
+            if content_service._is_instagram_url(body_data.data):
+                get_transcript = content_service._get_instagram_transcript
+            else:
+                get_transcript = content_service._get_tiktok_transcript
+            transcript = await run_stage(
+                "transcript",
+                deadline.stage_timeout(TRANSCRIPT_BUDGET_SHARE),
+                get_transcript,
+                body_data.data,
+            )
 
-                logger.debug(f"Transcript: {transcript}")
+            logger.debug(f"Transcript: {transcript}")
 
-                # Extract statements from transcript
-                await send_message(client_id, ProgressUpdate(stage="extraction"))
-                statements = content_service.openai_service.extract_statements(
-                    transcript
-                )
-                logger.debug(f"Statements: {statements}")
-            else:
-                await send_message(
-                    client_id,
-                    ErrorMessage(
-                        "Invalid URL (only Instagram and TikTok are supported)"
-                    ),
-                )
-                return
-        else:
-            # Process as text
+            # Extract statements from transcript
             await send_message(client_id, ProgressUpdate(stage="extraction"))
-            statements = content_service.openai_service.extract_statements(
-                str(body_data.data)
+            statements = await run_stage(
+                "extraction",
+                deadline.stage_timeout(EXTRACTION_BUDGET_SHARE),
+                content_service.openai_service.extract_statements,
+                transcript,
+            )
+            logger.debug(f"Statements: {statements}")
+        else:
+            await send_message(
+                client_id,
+                ErrorMessage("Invalid URL (only Instagram and TikTok are supported)"),
             )
+            return None
+    else:
+        # Process as text
+        await send_message(client_id, ProgressUpdate(stage="extraction"))
+        statements = await run_stage(
+            "extraction",
+            deadline.stage_timeout(EXTRACTION_BUDGET_SHARE),
+            content_service.openai_service.extract_statements,
+            str(body_data.data),
+        )
+
+    # Wait 2 second - this is a hack to allow the client to update the UI
+    await asyncio.sleep(2)
+
+    # Limit number of statements
+    # TODO: add back in and notify user if statements were limited
+    # original_count = len(statements)
+    # was_limited = original_count > MAX_STATEMENTS
 
-        # Wait 2 second - this is a hack to allow the client to update the UI
-        await asyncio.sleep(2)
-
-        # Limit number of statements
-        # TODO: add back in and notify user if statements were limited
-        # original_count = len(statements)
-        statements = statements[:MAX_STATEMENTS]
-        # was_limited = original_count > MAX_STATEMENTS
-
-        # await send_message(
-        #     client_id,
-        #     ProgressUpdate(
-        #         stage="extraction_complete",
-        #         statements=statements,
-        #     ),
-        # )
-
-        # Wait 2 second - this is a hack to allow the client to update the UI
-        # await asyncio.sleep(2)
-
-        # Check each statement
-        results = []
-        for i, statement in enumerate(statements):
+    # await send_message(
+    #     client_id,
+    #     ProgressUpdate(
+    #         stage="extraction_complete",
+    #         statements=statements,
+    #     ),
+    # )
+
+    # Wait 2 second - this is a hack to allow the client to update the UI
+    # await asyncio.sleep(2)
+
+    return statements[:MAX_STATEMENTS]
+
+
+async def _process_request(
+    job: Job,
+    body_data: BodyData,
+    content_service: ContentService,
+    result_store: ResultStore,
+    deadline: Deadline,
+):
+    client_id = job.client_id
+    span = current_span()
+    span.set_attributes({"deadline.budget": deadline.budget, "job.id": job.job_id})
+
+    # Send initial progress - started
+    await send_message(client_id, ProgressUpdate(stage="started", jobId=job.job_id))
+
+    # Resumed jobs already have their statements
+    if job.statements is None:
+        job.statements = await _extract_statements(
+            client_id, body_data, content_service, deadline
+        )
+        if job.statements is None:
+            return
+
+    statements = job.statements
+
+    # Verify one representative per group of near-duplicate statements
+    representatives = group_statements(statements)
+    checks = job.checks
+    logger.debug(
+        f"Verifying {len(set(representatives))} of {len(statements)} statements"
+    )
+
+    span.set_attributes(
+        {
+            "statements.count": len(statements),
+            "statements.verified": len(set(representatives)),
+        }
+    )
+
+    # Check each statement until the deadline is reached
+    results = []
+    timed_out = False
+    for i, (statement, representative) in enumerate(zip(statements, representatives)):
+        if not timed_out:
             # Send progress update for each statement
             await send_message(
                 client_id,
@@ -327,33 +593,40 @@ async def process_request(
             # Give a small delay to allow progress updates to be seen
             await asyncio.sleep(0.1)
 
-            # Check the statement
-            statement_check, sources = content_service.openai_service.check_statement(
-                statement
-            )
+            # Check the statement (or reuse the verdict of its representative)
+            if representative not in checks:
+                try:
+                    checks[representative] = await run_stage(
+                        "verification",
+                        deadline.remaining(),
+                        content_service.check_statement,
+                        statements[representative],
+                    )
+                except TimeoutError:
+                    logger.warning(f"Deadline reached for {client_id}")
+                    timed_out = True
 
-            # Add result
-            result = {
-                "statement": statement,
-                "probability": statement_check.probability,
-                "reason": statement_check.reason,
-                "sources": sources,
-            }
-            results.append(result)
+        # Add result
+        if representative in checks:
+            results.append(statement_result(statement, *checks[representative]))
+        else:
+            results.append(timed_out_result(statement))
 
-        # Send final results
-        await send_message(client_id, CompleteMessage(results=results))
+    span.set_attribute("deadline.exceeded", timed_out)
 
-        logger.info(f"Fact check complete for {client_id}")
-        logger.debug(f"Results: {results}")
+    # Send final results
+    # Store the result so it can be shared without running the pipeline again
+    result_id = await asyncio.to_thread(
+        result_store.save, str(body_data.data), results, timed_out
+    )
 
-    except Exception as e:
-        logger.error(
-            f"Error during fact checking for {client_id}: {str(e)}", exc_info=True
-        )
-        await send_message(
-            client_id, ErrorMessage(f"Error during fact checking: {str(e)}")
-        )
+    await send_message(
+        client_id,
+        CompleteMessage(results=results, timedOut=timed_out, resultId=result_id),
+    )
+
+    logger.info(f"Fact check complete for {client_id}")
+    logger.debug(f"Results: {results}")
 
 
 async def send_error(client_id: str, message: str):
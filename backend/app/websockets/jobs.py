@@ -0,0 +1,61 @@
+"""State of fact-check jobs running over WebSocket connections."""
+
+import asyncio
+import uuid
+from typing import Any
+
+from app.models.schemas import StatementCheck
+
+
+class Job:
+    """An in-flight fact-check job and the progress it has made so far."""
+
+    def __init__(
+        self,
+        client_id: str,
+        data: str,
+        timeout: float | None = None,
+        job_id: str | None = None,
+    ):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.client_id = client_id
+        self.data = data
+        self.timeout = timeout
+        # Set once statements have been extracted
+        self.statements: list[str] | None = None
+        # Verdicts by index of the statement they were computed for
+        self.checks: dict[int, tuple[StatementCheck, list[str]]] = {}
+        self.task: asyncio.Task | None = None
+
+    def to_checkpoint(self) -> dict[str, Any]:
+        """Serializable snapshot from which the job can be resumed."""
+        return {
+            "jobId": self.job_id,
+            "clientId": self.client_id,
+            "data": self.data,
+            "timeout": self.timeout,
+            "statements": self.statements,
+            "checks": {
+                str(index): {
+                    "check": statement_check.model_dump(),
+                    "sources": sources,
+                }
+                for index, (statement_check, sources) in self.checks.items()
+            },
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict[str, Any], client_id: str) -> "Job":
+        """Restore a job for the client that resumes it."""
+        job = cls(
+            client_id=client_id,
+            data=checkpoint["data"],
+            timeout=checkpoint.get("timeout"),
+            job_id=checkpoint["jobId"],
+        )
+        job.statements = checkpoint.get("statements")
+        job.checks = {
+            int(index): (StatementCheck(**check["check"]), check["sources"])
+            for index, check in checkpoint.get("checks", {}).items()
+        }
+        return job
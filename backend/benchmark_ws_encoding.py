@@ -0,0 +1,136 @@
+"""Benchmark of bytes sent per fact-check job for each WebSocket encoding."""
+
+import asyncio
+import zlib
+
+from app.websockets.encoding import MessageEncoder
+from app.websockets.fact_check import (
+    CompleteMessage,
+    ConnectionMessage,
+    ProgressUpdate,
+)
+
+STATEMENTS = [
+    "The Great Wall of China is visible from space with the naked eye.",
+    "Humans only use 10 percent of their brains.",
+    "Humans use just 10% of their brain.",
+    "Lightning never strikes the same place twice.",
+    "Goldfish have a memory span of only three seconds.",
+    "The Eiffel Tower grows taller in the summer because of heat expansion.",
+    "Bats are blind and navigate only by echolocation.",
+    "Bulls are enraged by the color red.",
+    "Mount Everest is the tallest mountain on Earth measured from sea level.",
+    "Water conducts electricity because of the ions dissolved in it.",
+]
+
+DETAILS = [
+    "Astronauts in low orbit report that the wall is too narrow to see.",
+    "Brain imaging shows activity across nearly all regions over a day.",
+    "Brain imaging shows activity across nearly all regions over a day.",
+    "Tall structures such as the Empire State Building are hit many times a year.",
+    "Experiments show goldfish can remember trained cues for months.",
+    "The iron structure expands by up to 15 centimetres on hot days.",
+    "All bat species can see, and many rely on vision as well as echolocation.",
+    "Bulls are dichromats and react to the movement of the cape, not its color.",
+    "Its summit is 8,849 metres above sea level, higher than any other peak.",
+    "Pure water is a poor conductor; dissolved salts carry the current.",
+]
+
+SOURCES = [
+    "https://en.wikipedia.org/wiki/List_of_common_misconceptions",
+    "https://www.nasa.gov/feature/great-wall-of-china",
+    "https://www.scientificamerican.com/article/do-people-only-use-10-percent-of-their-brains/",
+    "https://www.britannica.com/science/lightning-meteorology",
+    "https://www.nationalgeographic.com/animals/article/goldfish-memory",
+    "https://www.toureiffel.paris/en/news/130-years/what-are-eiffel-towers-secrets",
+]
+
+
+def job_messages() -> list[dict]:
+    """Messages of one job as the server sends them."""
+    results = []
+    for i, statement in enumerate(STATEMENTS):
+        # Near-duplicate statements get the same verdict
+        verdict = 1 if i == 2 else i
+        results.append(
+            {
+                "statement": statement,
+                "probability": "low" if verdict % 3 else "high",
+                "reason": f"Reliable sources address this claim. {DETAILS[verdict]}",
+                "sources": [SOURCES[0], SOURCES[verdict % len(SOURCES)]],
+            }
+        )
+
+    messages = [
+        ConnectionMessage(client_id="benchmark"),
+        ProgressUpdate(stage="started", jobId="7b6de393bbc2437897b2be12f6c5e680"),
+        ProgressUpdate(stage="extraction"),
+    ]
+    for i, statement in enumerate(STATEMENTS):
+        messages.append(
+            ProgressUpdate(
+                stage="verification",
+                statementIndex=i,
+                totalStatements=len(STATEMENTS),
+                currentStatement=statement,
+            )
+        )
+    messages.append(
+        CompleteMessage(results, resultId="4f1c2d0e9b7a6c5d4e3f2a1b0c9d8e7f")
+    )
+    return messages
+
+
+class FrameRecorder:
+    """Stands in for a WebSocket and records the frames sent to it."""
+
+    def __init__(self):
+        self.frames: list[bytes] = []
+
+    async def send_text(self, text: str):
+        self.frames.append(text.encode("utf-8"))
+
+    async def send_bytes(self, data: bytes):
+        self.frames.append(data)
+
+
+def deflated_size(frames: list[bytes]) -> int:
+    """Size of the frames with permessage-deflate and context takeover."""
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    total = 0
+    for frame in frames:
+        data = compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        # RFC 7692 drops the empty block that ends each message
+        total += len(data) - 4
+    return total
+
+
+async def measure(encoding: str, delta: bool) -> tuple[int, int]:
+    encoder = MessageEncoder(encoding, delta)
+    websocket = FrameRecorder()
+    for message in job_messages():
+        await encoder.send(websocket, message)
+    return sum(len(frame) for frame in websocket.frames), deflated_size(
+        websocket.frames
+    )
+
+
+async def main():
+    variants = [("json", False), ("json", True), ("msgpack", False), ("msgpack", True)]
+    baseline = None
+    print(f"{'encoding':<16}{'bytes/job':>12}{'saved':>8}{'deflate':>12}{'saved':>8}")
+    for encoding, delta in variants:
+        if encoding == "msgpack" and MessageEncoder(encoding).encoding != "msgpack":
+            print(f"{encoding:<16}{'(msgpack not installed)':>40}")
+            continue
+        raw, deflated = await measure(encoding, delta)
+        baseline = baseline or raw
+        name = f"{encoding}{' + delta' if delta else ''}"
+        print(
+            f"{name:<16}{raw:>12}{1 - raw / baseline:>8.0%}"
+            f"{deflated:>12}{1 - deflated / baseline:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
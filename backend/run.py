@@ -1,18 +1,89 @@
 """Server startup script."""
 
+import asyncio
+import subprocess
 import sys
 
 import uvicorn
 
+
+class DrainingServer(uvicorn.Server):
+    """Uvicorn server that hands off in-flight fact checks before shutting down."""
+
+    _drain_task = None
+
+    async def shutdown(self, sockets=None):
+        from app.websockets.fact_check import drain
+
+        # Finish or checkpoint running jobs while connections are still open
+        self._drain_task = asyncio.ensure_future(drain())
+        try:
+            await self._drain_task
+        except asyncio.CancelledError:
+            pass
+        await super().shutdown(sockets=sockets)
+
+    def handle_exit(self, sig, frame):
+        # A second signal skips the drain and exits right away
+        if self.should_exit and self._drain_task is not None:
+            self._drain_task.get_loop().call_soon_threadsafe(self._drain_task.cancel)
+        super().handle_exit(sig, frame)
+
+
+# Imports the app and runs its startup, printing the seconds until it is ready
+STARTUP_SCRIPT = """
+import asyncio, time
+start = time.perf_counter()
+from app.main import app
+async def main():
+    async with app.router.lifespan_context(app):
+        print(time.perf_counter() - start)
+asyncio.run(main())
+"""
+
+
+def profile_imports(top: int = 20):
+    """Print the startup time and the modules that take longest to import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(result.returncode)
+
+    # Lines look like "import time:  self [us] | cumulative | module"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            modules.append((int(self_us), int(cumulative_us), name.strip()))
+
+    app_import = next(cum for _, cum, name in modules if name == "app.main")
+    print(f"Import of app.main: {app_import / 1e6:.3f}s")
+    print(f"Ready (import and startup): {float(result.stdout.split()[-1]):.3f}s")
+
+    for title, key in (("cumulative", 1), ("self", 0)):
+        print(f"\nSlowest imports by {title} time:")
+        for module in sorted(modules, key=lambda m: m[key], reverse=True)[:top]:
+            print(f"{module[key] / 1000:>10.1f} ms  {module[2]}")
+
+
 if __name__ == "__main__":
+    if "--profile-imports" in sys.argv:
+        profile_imports()
     # if --prod is passed, run in production mode
-    if "--prod" in sys.argv:
-        uvicorn.run(
+    elif "--prod" in sys.argv:
+        config = uvicorn.Config(
             "app.main:app",
             host="0.0.0.0",
             port=8000,
             reload=False,
         )
+        DrainingServer(config).run()
     else:
         uvicorn.run(
             "app.main:app",
@@ -0,0 +1,119 @@
+"""Test script for routing WebSocket messages between workers.
+
+Runs two file-backed event bus workers in one process, sharing a temporary
+directory, so no second server is needed.
+"""
+
+import asyncio
+import tempfile
+
+from app.websockets.event_bus import FileEventBus
+
+
+async def start_workers(directory, deliver_a, deliver_b):
+    a = FileEventBus(directory, poll_interval=0.01)
+    b = FileEventBus(directory, poll_interval=0.01)
+    await a.start(deliver_a)
+    await b.start(deliver_b)
+    return a, b
+
+
+async def wait_for(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+async def check_routes_messages_in_order():
+    """Messages published on one worker reach the owner of the client in order."""
+    received = []
+
+    async def deliver_a(client_id, message):
+        received.append((client_id, message))
+        return True
+
+    async def deliver_b(client_id, message):
+        return False
+
+    with tempfile.TemporaryDirectory() as directory:
+        a, b = await start_workers(directory, deliver_a, deliver_b)
+        # Client ids come from the URL and may contain path characters
+        await a.register("client/../1")
+
+        for i in range(5):
+            assert await b.publish("client/../1", {"i": i})
+        assert not await b.publish("nobody", {"i": 0})
+        # Clients of the publishing worker itself are delivered locally
+        assert not await a.publish("client/../1", {"i": 0})
+
+        await wait_for(lambda: len(received) == 5)
+        assert [message["i"] for _, message in received] == list(range(5))
+
+        await a.stop()
+        await b.stop()
+
+
+async def check_skips_unreadable_messages():
+    """A corrupt inbox file does not drop the other messages of its batch."""
+
+    async def deliver(client_id, message):
+        return False
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The receiving worker is not started, so its inbox is only read here
+        a = FileEventBus(directory)
+        a._inbox.mkdir(parents=True)
+        b = FileEventBus(directory)
+        await b.start(deliver)
+        await a.register("client")
+
+        await b.publish("client", {"i": 0})
+        (a._inbox / "00000000000000000001-corrupt.json").write_text("{not json")
+        await b.publish("client", {"i": 1})
+
+        assert [message["i"] for _, message in a._receive()] == [0, 1]
+        assert not any(a._inbox.glob("*.json"))
+
+        await a.stop()
+        await b.stop()
+
+
+async def check_reconnect_moves_client():
+    """The old worker leaving does not unregister a client that reconnected."""
+
+    async def deliver(client_id, message):
+        return True
+
+    with tempfile.TemporaryDirectory() as directory:
+        a, b = await start_workers(directory, deliver, deliver)
+        await a.register("client")
+        await b.register("client")
+        await a.unregister("client")
+
+        assert await a.publish("client", {"i": 0})
+
+        await b.stop()
+        # Nobody holds the client any more
+        assert not await a.publish("client", {"i": 1})
+        await a.stop()
+
+
+def test_routes_messages_in_order():
+    asyncio.run(check_routes_messages_in_order())
+
+
+def test_skips_unreadable_messages():
+    asyncio.run(check_skips_unreadable_messages())
+
+
+def test_reconnect_moves_client():
+    asyncio.run(check_reconnect_moves_client())
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
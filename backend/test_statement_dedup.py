@@ -0,0 +1,75 @@
+"""Test script for grouping of near-duplicate statements."""
+
+from app.core.deadline import Deadline
+from app.services.statement_dedup import group_statements
+from app.services.stream_service import StreamingFactCheck
+
+# Pairs that must keep their own verdicts
+DIFFERENT_CLAIMS = [
+    # Antonyms
+    (
+        "Smoking increases the risk of lung cancer in adult men",
+        "Smoking decreases the risk of lung cancer in adult men",
+    ),
+    (
+        "The Amazon rainforest produces most of the oxygen on Earth",
+        "The Amazon rainforest produces little of the oxygen on Earth",
+    ),
+    # Entity swaps
+    (
+        "Einstein was born in Germany in 1879",
+        "Einstein was born in Austria in 1879",
+    ),
+    ("Germany beat Brazil 7-1 in 2014", "Brazil beat Germany 7-1 in 2014"),
+    # Negation, numbers and extra qualifiers
+    ("Vaccines cause autism", "Vaccines don't cause autism"),
+    ("The Eiffel Tower is 330 metres tall", "The Eiffel Tower is 300 metres tall"),
+    ("Coffee causes dehydration", "Coffee causes dehydration in children"),
+]
+
+# Pairs that differ only in wording and share one verdict
+SAME_CLAIMS = [
+    ("Studies show that vaccines cause autism.", "Vaccines cause autism"),
+    ("Humans use 10% of their brains", "humans use 10 percent of their brain."),
+    (
+        "According to experts, coffee causes dehydration",
+        "Coffee actually causes dehydration",
+    ),
+]
+
+
+def test_different_claims_are_not_merged():
+    for a, b in DIFFERENT_CLAIMS:
+        assert group_statements([a, b]) == [0, 1], (a, b)
+
+
+def test_rewordings_are_merged():
+    for a, b in SAME_CLAIMS:
+        assert group_statements([a, b]) == [0, 0], (a, b)
+
+
+def test_first_statement_represents_its_group():
+    statements = [
+        "Vaccines cause autism",
+        "Coffee causes dehydration",
+        "Studies show vaccines cause autism",
+    ]
+    assert group_statements(statements) == [0, 1, 0]
+
+
+def test_stream_keeps_contradicting_statements():
+    """Statements found in later windows are only dropped if they repeat a claim."""
+    fact_check = StreamingFactCheck(None, Deadline(10))
+    for a, b in DIFFERENT_CLAIMS:
+        fact_check._add_statements([a])
+        assert fact_check._add_statements([b]), (a, b)
+    for a, b in SAME_CLAIMS:
+        fact_check._add_statements([a])
+        assert not fact_check._add_statements([b]), (a, b)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,165 @@
+"""Test script for transcript hedging, failover and circuit breakers.
+
+Uses local stub providers, so no API keys or network access are needed.
+"""
+
+import threading
+import time
+
+from app.core.config import CIRCUIT_BREAKER_FAILURE_THRESHOLD
+from app.services.transcript_service import (
+    RapidAPITranscriptProvider,
+    TranscriptError,
+    TranscriptService,
+    TranscriptUnavailableError,
+)
+
+
+class StubProvider:
+    """Provider that answers after a delay, or fails, as scripted per call."""
+
+    def __init__(self, name, delays, fail=False, unavailable=False, timeout=0.2):
+        self.name = name
+        self.timeout = timeout
+        self.delays = list(delays)
+        self.fail = fail
+        self.unavailable = unavailable
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        with self._lock:
+            call = self.calls
+            self.calls += 1
+        time.sleep(self.delays[min(call, len(self.delays) - 1)])
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        if self.unavailable:
+            raise TranscriptUnavailableError(f"Empty transcript from {self.name}")
+        return f"{self.name} call {call}"
+
+
+def test_hedges_with_next_provider():
+    """A slow provider is hedged with the next one, which wins."""
+    slow = StubProvider("slow", [2.0])
+    fast = StubProvider("fast", [0.05])
+    service = TranscriptService({"tiktok": [slow, fast]})
+
+    started = time.monotonic()
+    assert service.get_transcript("tiktok", "url") == "fast call 0"
+    assert time.monotonic() - started < 1.0
+
+
+def test_hedges_single_provider_with_itself():
+    """A platform's only provider is asked again when its first call is slow."""
+    provider = StubProvider("only", [2.0, 0.05])
+    service = TranscriptService({"instagram": [provider]})
+
+    started = time.monotonic()
+    assert service.get_transcript("instagram", "url") == "only call 1"
+    assert time.monotonic() - started < 1.0
+    assert provider.calls == 2
+
+
+def test_fails_over_after_error():
+    """A failing provider hands over to the next one straight away."""
+    broken = StubProvider("broken", [0.0], fail=True)
+    backup = StubProvider("backup", [0.0])
+    service = TranscriptService({"tiktok": [broken, backup]})
+
+    assert service.get_transcript("tiktok", "url") == "backup call 0"
+
+
+def test_circuit_breaker_skips_failing_provider():
+    """After repeated failures the provider is not called until it cools down."""
+    broken = StubProvider("broken", [0.0], fail=True)
+    backup = StubProvider("backup", [0.0])
+    service = TranscriptService({"tiktok": [broken, backup]})
+
+    for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        service.get_transcript("tiktok", "url")
+    assert service._breakers["broken"].state == "open"
+
+    calls = broken.calls
+    assert service.get_transcript("tiktok", "url").startswith("backup")
+    assert broken.calls == calls
+
+
+def test_bad_input_leaves_breaker_closed():
+    """Videos without a transcript are neither retried nor counted as failures."""
+    provider = StubProvider("only", [0.0], unavailable=True)
+    service = TranscriptService({"instagram": [provider]})
+
+    for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD + 1):
+        try:
+            service.get_transcript("instagram", "silent video")
+        except TranscriptUnavailableError:
+            pass
+        else:
+            raise AssertionError("expected TranscriptUnavailableError")
+
+    assert provider.calls == CIRCUIT_BREAKER_FAILURE_THRESHOLD + 1
+    assert service._breakers["only"].state == "closed"
+
+    provider.unavailable = False
+    assert service.get_transcript("instagram", "valid video").startswith("only")
+
+
+class StubResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.body
+
+
+class StubSession:
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+
+def test_rapidapi_classifies_errors():
+    """Rejected and silent videos are unavailable, overload is a provider failure."""
+    provider = RapidAPITranscriptProvider("rapid", "https://x/y", "x", timeout=1)
+    cases = [
+        (StubResponse(404), TranscriptUnavailableError),
+        (StubResponse(200, {"response": {"text": " "}}), TranscriptUnavailableError),
+        (StubResponse(429), RuntimeError),
+        (StubResponse(503), RuntimeError),
+    ]
+    for response, error in cases:
+        provider._session = StubSession(response)
+        try:
+            provider.fetch("url")
+        except error:
+            pass
+        else:
+            raise AssertionError(f"expected {error.__name__}")
+
+
+def test_all_providers_failing():
+    """The error names every provider that was tried."""
+    service = TranscriptService(
+        {"tiktok": [StubProvider("a", [0.0], fail=True)]},
+    )
+    try:
+        service.get_transcript("tiktok", "url")
+    except TranscriptError as e:
+        assert "a is down" in str(e)
+    else:
+        raise AssertionError("expected TranscriptError")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")